@@ -21,46 +21,123 @@ __version__ = '3.1.1'
 
 import time
 import sys
+import importlib
+import threading
+from collections import OrderedDict
 from . import ca
 from . import dbr
-from . import pv
-from . import alarm
-from . import device
-from . import motor
-
-PV    = pv.PV
-Alarm = alarm.Alarm
-Motor = motor.Motor
-Device = device.Device 
+
 poll  = ca.poll
 
+# submodules and classes imported on first use:
+#   name: (submodule, attribute or None for the submodule itself)
+_LAZY_ = {'pv': ('pv', None), 'PV': ('pv', 'PV'),
+          'connect_pvs': ('pv', 'connect_pvs'),
+          'get_pvs': ('pv', 'get_pvs'),
+          'CompactPV': ('pv', 'CompactPV'),
+          'EventFilter': ('pv', 'EventFilter'),
+          'alarm': ('alarm', None), 'Alarm': ('alarm', 'Alarm'),
+          'device': ('device', None), 'Device': ('device', 'Device'),
+          'motor': ('motor', None), 'Motor': ('motor', 'Motor')}
+
+def __getattr__(name):
+    "import submodules and their classes on first use"
+    if name not in _LAZY_:
+        raise AttributeError("module '%s' has no attribute '%s'" %
+                             (__name__, name))
+    modname, attr = _LAZY_[name]
+    out = importlib.import_module('.%s' % modname, __name__)
+    if attr is not None:
+        out = getattr(out, attr)
+    globals()[name] = out
+    return out
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_))
+
+# module __getattr__ needs Python 3.7
+if sys.version_info < (3, 7):
+    for _name in _LAZY_:
+        __getattr__(_name)
+
 # compatibility with other CA libraries
 # from  .compat import epicsPV
 
-# a local cache for PVs used in caget/caput/cainfo/camonitor functions
-_CACHE_ = {}
+# the number of PVs kept in _CACHE_, and the time (in seconds) an unused
+# PV is kept.  Evicted PVs are disconnected.  None for no limit.
+CACHE_SIZE = None
+CACHE_IDLE_TIMEOUT = None
+
+# a local cache for PVs used in caget/caput/cainfo/camonitor functions,
+# in order of last use
+_CACHE_ = OrderedDict()
+_CACHE_USED_ = {}
+_CACHE_STATS_ = {'hits': 0, 'misses': 0, 'evictions': 0}
+_CACHE_LOCK_ = threading.RLock()
 # a local cache for Monitored PVs
 _MONITORS_ = {}  
 
 def __create_pv(pvname, timeout=5.0):
     "create PV, wait for connection: "
-    if pvname in _CACHE_:
-        return _CACHE_[pvname]
+    with _CACHE_LOCK_:
+        thispv = _CACHE_.pop(pvname, None)
+        if thispv is not None:
+            _CACHE_[pvname] = thispv
+            _CACHE_USED_[pvname] = time.time()
+            _CACHE_STATS_['hits'] += 1
+        else:
+            _CACHE_STATS_['misses'] += 1
+    if thispv is not None:
+        return thispv
 
-    start_time = time.time()
+    from .pv import PV
     thispv = PV(pvname)
-    thispv.connect()
-    while not thispv.connected:
-        poll()
-        if time.time()-start_time > timeout:
-            break
-    if not thispv.connected:
+    if not thispv.wait_for_connection(timeout=timeout):
         ca.write('cannot connect to %s' % pvname)
         return None
     # save this one for next time
-    _CACHE_[pvname] = thispv
+    with _CACHE_LOCK_:
+        _CACHE_[pvname] = thispv
+        _CACHE_USED_[pvname] = time.time()
+    _evict_pvs()
     return thispv
 
+def _evict_pvs():
+    """disconnect and remove PVs from _CACHE_ beyond CACHE_SIZE, least
+    recently used first, or unused for more than CACHE_IDLE_TIMEOUT.
+    PVs used by camonitor() are kept."""
+    if CACHE_SIZE is None and CACHE_IDLE_TIMEOUT is None:
+        return
+    evicted = []
+    now = time.time()
+    with _CACHE_LOCK_:
+        for pvname in list(_CACHE_.keys()):
+            over = (CACHE_SIZE is not None and
+                    len(_CACHE_) > CACHE_SIZE)
+            idle = (CACHE_IDLE_TIMEOUT is not None and
+                    now - _CACHE_USED_[pvname] > CACHE_IDLE_TIMEOUT)
+            if not (over or idle):
+                break
+            if pvname in _MONITORS_:
+                continue
+            evicted.append(_CACHE_.pop(pvname))
+            _CACHE_USED_.pop(pvname)
+            _CACHE_STATS_['evictions'] += 1
+    for thispv in evicted:
+        thispv.disconnect()
+
+def cache_info():
+    """return dictionary of the number of PVs in the cache used by caget()
+    and related functions ('pvs'), and counts of lookups that found a PV
+    ('hits') or created a new one ('misses'), and of PVs evicted
+    ('evictions'), with the same for the Channels in the ca module
+    ('channels', see ca.channel_cache_info())"""
+    with _CACHE_LOCK_:
+        out = dict(_CACHE_STATS_)
+        out['pvs'] = len(_CACHE_)
+    out['channels'] = ca.channel_cache_info()
+    return out
+
 def caput(pvname, value, wait=False, timeout=60):
     """caput(pvname, value, wait=False, timeout=60)
     simple put to a pv's value.
@@ -73,7 +150,7 @@ def caput(pvname, value, wait=False, timeout=60):
     if thispv is not None:
         return thispv.put(value, wait=wait, timeout=timeout)
 
-def caget(pvname, as_string=False, count=None, as_numpy=True):
+def caget(pvname, as_string=False, count=None, as_numpy=True, max_age=None):
     """caget(pvname, as_string=False)
     simple get of a pv's value..
        >>> x = caget('xx.VAL')
@@ -85,6 +162,11 @@ def caget(pvname, as_string=False, count=None, as_numpy=True):
     to get a truncated amount of data from an array, you can specify
     the count with
        >>> x = caget('MyArray.VAL', count=1000)
+
+    values of monitored PVs are always current.  For other PVs (such
+    as large arrays), max_age allows a value received up to max_age
+    seconds ago to be returned without getting it again:
+       >>> x = caget('MyArray.VAL', max_age=0.5)
     """
     thispv = __create_pv(pvname)
     if thispv is not None:
@@ -92,10 +174,29 @@ def caget(pvname, as_string=False, count=None, as_numpy=True):
             thispv.get_ctrlvars()
         val = thispv.get(count=count,
                          as_string=as_string,
-                         as_numpy=as_numpy)
+                         as_numpy=as_numpy,
+                         max_age=max_age)
         poll()
         return val
 
+def caget_many(pvlist, as_string=False, count=None, as_numpy=True,
+               timeout=5.0):
+    """caget_many(pvlist, as_string=False, count=None, as_numpy=True)
+    get values for a list of PVs, using a single request for all of them
+       >>> x, y, z = caget_many(['xx.VAL', 'yy.VAL', 'zz.VAL'])
+
+    returns a list of values in the same order as the list of PV names,
+    with None for PVs that could not be connected or read.
+    """
+    conn, unconn = ca.connect_many(pvlist, timeout=timeout)
+    chids = [conn.get(pvname, unconn.get(pvname)) for pvname in pvlist]
+    out = [val for val, stat in ca.get_many(chids, as_string=as_string,
+                                            count=count, as_numpy=as_numpy,
+                                            timeout=timeout)]
+    for chid in list(conn.values()) + list(unconn.values()):
+        ca.release_channel(chid)
+    return out
+
 def cainfo(pvname, print_out=True):
     """cainfo(pvname,print_out=True)
 
@@ -143,14 +244,18 @@ def camonitor(pvname, writer=None, callback=None):
     if writer is None:
         writer = ca.write
     if callback is None:
+        from .pv import fmt_time
         def callback(pvname=None, value=None, char_value=None, **kwds):
             "generic monitor callback"
             if char_value is None:
                 char_value = repr(value)
-            writer("%.32s %s %s" % (pvname, pv.fmt_time(), char_value))
+            writer("%.32s %s %s" % (pvname, fmt_time(), char_value))
         
     thispv = __create_pv(pvname)
     _MONITORS_[pvname] = thispv
     if thispv is not None:
         thispv.get()
         thispv.add_callback(callback, with_ctrlvars=True)
+
+__all__ = ['ca', 'dbr', 'poll', 'caput', 'caget', 'caget_many', 'cainfo',
+           'camonitor', 'camonitor_clear', 'cache_info'] + sorted(_LAZY_)
@@ -0,0 +1,201 @@
+#!/usr/bin/python
+#  M Newville <newville@cars.uchicago.edu>
+#  The University of Chicago, 2010
+#  Epics Open License
+"""
+asyncio interface to Epics Channel Access
+
+This module requires Python 3.6 or higher, and is not imported by
+'import epics'.  Use it as
+
+  >>> from epics import aio
+  >>> async def main():
+  ...     value = await aio.get('XXX:m1.VAL')
+  ...     await aio.put('XXX:m1.VAL', value + 1, wait=True)
+  ...     async for event in aio.monitor('XXX:m1.RBV'):
+  ...         print(event['pvname'], event['value'])
+
+All functions take either a PV name, a chid, or an epics.PV.  Nothing
+here blocks the event loop waiting for the network: completion comes
+from the CA callbacks in the ca module, which hand their results to the
+event loop with call_soon_threadsafe().
+"""
+import asyncio
+import ctypes
+
+from . import ca
+from . import dbr
+
+# user arguments for get callbacks that have not yet run, by id()
+_pending_gets = {}
+
+try:
+    _get_loop = asyncio.get_running_loop
+except AttributeError:
+    # Python 3.6: inside a coroutine, this is the running loop
+    _get_loop = asyncio.get_event_loop
+
+async def connect(pvname, timeout=None):
+    """create a Channel for a PV name and wait for it to connect.
+
+    returns the chid, which should be released with ca.release_channel()
+    when no longer needed.  Raises asyncio.TimeoutError if the Channel
+    does not connect within timeout (ca.DEFAULT_CONNECTION_TIMEOUT
+    by default)."""
+    if timeout is None:
+        timeout = ca.DEFAULT_CONNECTION_TIMEOUT
+    loop = _get_loop()
+    future = loop.create_future()
+
+    def onconnect(pvname=None, chid=None, conn=True, **kws):
+        "connection callback"
+        if conn:
+            loop.call_soon_threadsafe(_set_result, future, True)
+
+    chid = ca.create_channel(pvname, callback=onconnect)
+    try:
+        if not ca.isConnected(chid):
+            await asyncio.wait_for(future, timeout)
+    except BaseException:
+        ca.release_channel(chid, callback=onconnect)
+        raise
+    entry = ca._cache.get_chid(chid)
+    if entry is not None and onconnect in entry.callbacks:
+        entry.callbacks.remove(onconnect)
+    return chid
+
+async def get(pvname, ftype=None, count=None, as_numpy=True,
+              timeout=None):
+    """return the current value for a PV, as for ca.get().
+
+    Raises asyncio.TimeoutError if the value does not arrive
+    within timeout (10 seconds by default)."""
+    if timeout is None:
+        timeout = 10.0
+    chid, release = await _get_chid(pvname)
+    try:
+        return await _get(chid, ftype, count, as_numpy, timeout)
+    finally:
+        if release:
+            ca.release_channel(chid)
+
+async def _get(chid, ftype, count, as_numpy, timeout):
+    "get for a connected chid"
+    if ftype is None:
+        ftype = ca.field_type(chid)
+    nelem = ca.element_count(chid)
+    if count is not None:
+        nelem = min(count, nelem)
+
+    loop = _get_loop()
+    future = loop.create_future()
+
+    def ongetevent(value=None, **kws):
+        "get callback"
+        _pending_gets.pop(id(uarg), None)
+        loop.call_soon_threadsafe(_set_result, future, value)
+
+    # the user argument must be kept until the callback has run,
+    # even if this coroutine has timed out or been cancelled.
+    uarg = ctypes.py_object(ongetevent)
+    _pending_gets[id(uarg)] = uarg
+    ret = ca.libca.ca_array_get_callback(ftype, nelem, chid,
+                                         ca._CB_EVENT, uarg)
+    if ret != dbr.ECA_NORMAL:
+        _pending_gets.pop(id(uarg), None)
+    ca.PySEVCHK('get', ret)
+    ca.flush_io()
+    value = await asyncio.wait_for(future, timeout)
+    if not as_numpy and ca.HAS_NUMPY and nelem > 1:
+        value = list(value)
+    return value
+
+async def put(pvname, value, wait=False, timeout=30.0):
+    """put a value to a PV, as for ca.put().
+
+    With wait=True, this waits until processing has completed,
+    returning 1, or -1 if timeout has been exceeded."""
+    chid, release = await _get_chid(pvname)
+    try:
+        return await _put(chid, value, wait, timeout)
+    finally:
+        if release:
+            ca.release_channel(chid)
+
+async def _put(chid, value, wait, timeout):
+    "put for a connected chid"
+    if not wait:
+        return ca.put(chid, value)
+
+    loop = _get_loop()
+    future = loop.create_future()
+
+    def onputevent(pvname=None, **kws):
+        "put callback"
+        loop.call_soon_threadsafe(_set_result, future, True)
+
+    ret = ca.put(chid, value, callback=onputevent)
+    try:
+        await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        ret = -ret
+    return ret
+
+async def monitor(pvname, use_time=True, use_ctrl=False, mask=7,
+                  maxsize=0):
+    """asynchronous iterator of changes to a PV, as
+
+      >>> async for event in monitor('XXX:m1.RBV'):
+      ...     print(event['value'], event['timestamp'])
+
+    Each event is a dictionary with the keyword arguments passed to
+    subscription callbacks (pvname, value, status, timestamp, ...).
+    With maxsize > 0, at most maxsize events are queued: when the
+    queue is full, the oldest event is dropped.  The subscription is
+    cleared when the iteration ends."""
+    chid, release = await _get_chid(pvname)
+    loop = _get_loop()
+    queue = asyncio.Queue(maxsize=maxsize)
+
+    def onchanges(**kws):
+        "subscription callback"
+        loop.call_soon_threadsafe(_put_event, queue, kws)
+
+    try:
+        _cb, _uarg, evid = ca.create_subscription(chid, use_time=use_time,
+                                                  use_ctrl=use_ctrl,
+                                                  mask=mask,
+                                                  callback=onchanges)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            ca.clear_subscription(evid)
+    finally:
+        if release:
+            ca.release_channel(chid)
+
+async def _get_chid(pvname):
+    """return (chid, release) for a PV name, chid, or epics.PV, waiting
+    for the Channel to connect.  release is True if the Channel was
+    created here, and must be released with ca.release_channel()."""
+    if isinstance(pvname, str):
+        return await connect(pvname), True
+    chid = getattr(pvname, 'chid', pvname)
+    if isinstance(chid, int):
+        chid = dbr.chid_t(chid)
+    if not ca.isConnected(chid):
+        # wait for the Channel, without keeping the reference made here
+        ca.release_channel(await connect(ca.name(chid)))
+    return chid, False
+
+def _set_result(future, result):
+    "set result of a future, unless it was cancelled or timed out"
+    if not future.done():
+        future.set_result(result)
+
+def _put_event(queue, event):
+    "add event to queue, dropping the oldest event when full"
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
@@ -25,53 +25,116 @@ from pyparsing import Literal, Optional, Word, Combine, Regex, Group, \
     ZeroOrMore, OneOrMore, LineEnd, LineStart, StringEnd, \
     alphanums, alphas, nums
 
-from epics.pv import PV
+from epics import ca, dbr
 import os, datetime
 
-def restore_pvs(filepath, debug=False):
+def restore_pvs(filepath, debug=False, wait=False, timeout=30.0,
+                report=False):
     """ 
     Restore pvs from a save file via Channel Access 
     
     debug - Set to True if you want a line printed for each value set
+    wait - Set to True to wait for each put to complete (with put
+           callbacks), up to timeout seconds for all puts together.
+    report - Set to True to return a dictionary of pvname: result,
+             where result is 'ok' or a message for why the restore failed.
 
-    Returns True if all pvs were restored successfully.
+    All channels are connected together, and all values are then put
+    together, so that restoring many pvs does not cost one round trip
+    per pv.
+
+    Returns True if all pvs were restored successfully (or the report).
 
     """
-    success = True
     values = [ x for x in sav_file.parseFile(filepath).asList() if len(x) > 0 ]
     print( "Restoring %d values..." % ( len(values) ))
-    for v in values:
+    pvnames = [v[0] for v in values]
+    conn, unconn = ca.connect_many(pvnames)
+    chids = [conn.get(pvname, unconn.get(pvname)) for pvname in pvnames]
+    putvals = [_enum_index(chid, v[1]) for chid, v in zip(chids, values)]
+    status = ca.put_many(chids, putvals, wait=wait, timeout=timeout)
+    results = _results(pvnames, status)
+    for chid in list(conn.values()) + list(unconn.values()):
+        ca.release_channel(chid)
+
+    for (pvname, val) in values:
         if debug:
-            print( "Setting %s to %s..." % (v[0], v[1]))
-        try:
-            pv = PV(v[0])
-            pv.put(v[1]) # hopefully this is good enough as conversions go           
-        except Exception(e):
-            print( "Error restoring %s to %s : %s" % (v[0], v[1], e))
-            success = False
-    return success
+            print( "Setting %s to %s..." % (pvname, val))
+        if results[pvname] != 'ok':
+            print( "Error restoring %s to %s : %s" % (pvname, val,
+                                                     results[pvname]))
+    if report:
+        return results
+    return all(result == 'ok' for result in results.values())
     
-def save_pvs(request_file, save_pvs, debug=False):
+def save_pvs(request_file, save_pvs, debug=False, timeout=5.0, report=False):
     """
     Save pvs from a request file to a save file, via Channel Access
 
     Set debug=True to print a line for each PV saved.
 
-    With throw an exception if any PV cannot be found.
+    All channels are connected together, and all values are then read
+    with a single request.  PVs that cannot be read are written as
+    comments to the save file.  With report=True, a dictionary of
+    pvname: result is returned, where result is 'ok' or a message for
+    why the pv could not be saved.
 
     """
     pvnames = _parse_request_file(request_file)
-    pv_vals = [ (pvname, PV(pvname).get()) for pvname in pvnames ]
-    if debug:
-        for (pv,val) in pv_vals:
-            print( "PV %s = %s" % (pv, val))
+    conn, unconn = ca.connect_many(pvnames)
+    chids = [conn.get(pvname, unconn.get(pvname)) for pvname in pvnames]
+    pv_vals = ca.get_many(chids, timeout=timeout)
+    for chid in list(conn.values()) + list(unconn.values()):
+        ca.release_channel(chid)
+    results = _results(pvnames, [stat for (val, stat) in pv_vals])
+
+    lines = []
+    for pvname, (val, stat) in zip(pvnames, pv_vals):
+        if debug:
+            print( "PV %s = %s" % (pvname, val))
+        if results[pvname] == 'ok':
+            lines.append("%s %s\n" % (pvname, val))
+        else:
+            lines.append("#%s not saved: %s\n" % (pvname, results[pvname]))
     f = open(save_pvs, "w")
     f.write("# File saved automatically by save_restore.py on %s\n" % 
             datetime.datetime.now().isoformat())
     f.write("# Edit with extreme care.\n")
-    f.writelines([ "%s %s\n" % v for v in pv_vals ])
+    f.writelines(lines)
     f.write("<END>\n")
     f.close()
+    if report:
+        return results
+
+def _enum_index(chid, value):
+    """ 
+    Internal function to convert a saved value that is the name of
+    an enum state to the index of that state, for ca.put_many().
+    """
+    if ca.isConnected(chid):
+        enum_strs = ca.get_enum_strings(chid)
+        if enum_strs and value in enum_strs:
+            return list(enum_strs).index(value)
+    return value
+
+def _results(pvnames, status):
+    """ 
+    Internal function to make the report of pvname: 'ok' or the
+    reason for failure, from CA status codes.
+    """
+    results = {}
+    for pvname, stat in zip(pvnames, status):
+        if stat == dbr.ECA_NORMAL:
+            results[pvname] = 'ok'
+        elif stat == dbr.ECA_DISCONN:
+            results[pvname] = 'not connected'
+        elif stat == dbr.ECA_BADTYPE:
+            results[pvname] = 'cannot convert value'
+        elif stat == dbr.ECA_TIMEOUT:
+            results[pvname] = 'timed out'
+        else:
+            results[pvname] = ca.message(stat)
+    return results
 
 def _parse_request_file(request_file, macro_values={}):
     """ 
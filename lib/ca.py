@@ -13,25 +13,54 @@ See doc/  for user documentation.
 documentation here is developer documentation.
 """
 import ctypes
-import ctypes.util
 
 import os
 import sys
 import time
 import copy
+import heapq
+import itertools
 import atexit
+import importlib
+import threading
+import traceback
 import warnings
+from collections import OrderedDict
 # ignore warning about item size... for now??
 warnings.filterwarnings('ignore',
                         'Item size computed from the PEP 3118*',
                         RuntimeWarning)
 
-HAS_NUMPY = False
-try:
-    import numpy
-    HAS_NUMPY = True
-except ImportError:
-    pass
+def _has_module(name):
+    "return whether a module can be imported, without importing it"
+    try:
+        from importlib.util import find_spec
+    except ImportError:  # Python 2
+        import imp
+        try:
+            imp.find_module(name)
+            return True
+        except ImportError:
+            return False
+    return find_spec(name) is not None
+
+class _LazyModule(object):
+    """placeholder for a module that is imported on first use, which
+    then replaces the placeholder in the given namespace."""
+    def __init__(self, name, namespace):
+        self._name = name
+        self._namespace = namespace
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        self._namespace[self._name] = module
+        return getattr(module, attr)
+
+## numpy is only imported when array data is first converted,
+## so that 'import epics' stays fast for simple scripts.
+HAS_NUMPY = _has_module('numpy')
+if HAS_NUMPY:
+    numpy = _LazyModule('numpy', globals())
 
 from . import dbr
 
@@ -100,22 +129,276 @@ AUTO_CLEANUP = True
 # and for automatic conversion of numerical array data to numpy arrays
 AUTOMONITOR_MAXLENGTH = 16384
 
+##
+# ZERO_COPY_ARRAYS determines how array data is converted to numpy arrays:
+#   False  arrays are built as in earlier versions (several copies, and
+#          CHAR arrays from TIME/CTRL types become default integer arrays)
+#   True   get() returns an ndarray that uses the data buffer directly,
+#          and subscription callbacks get a single copy of the data.
+ZERO_COPY_ARRAYS = False
+
+##
+# USE_BUFFER_POOL sets whether get() reuses data buffers for arrays,
+# instead of allocating a new buffer for each call.
+USE_BUFFER_POOL = False
+
+##
+# Channels released by all their users (see release_channel()) are kept
+# open, so that they can be used again without reconnecting.
+# CHANNEL_CACHE_SIZE limits the number of cached Channels, by clearing
+# the least recently released ones, and CHANNEL_IDLE_TIMEOUT clears
+# Channels released for more than this many seconds.  None for no limit.
+CHANNEL_CACHE_SIZE = None
+CHANNEL_IDLE_TIMEOUT = None
+
+##
+# CTRLVARS_CACHE sets whether get_ctrlvars() keeps the CTRL fields of
+# each Channel it is used for, updated by a subscription for property and
+# alarm changes, so that only the first call for a Channel reads them
+# from the server.  This adds a CA monitor for each of these Channels.
+CTRLVARS_CACHE = False
+
+##
+# LIBCA_PATH_CACHE is a file in which find_libca() saves the path to
+# the CA library for each environment, so that it does not need to be
+# searched for again.  None (the default) to always search.  It can be
+# set with the environment variable PYEPICS_LIBCA_PATH_CACHE, for
+# example to ~/.pyepics/libca_path.json.
+LIBCA_PATH_CACHE = os.environ.get('PYEPICS_LIBCA_PATH_CACHE', None) or None
+if LIBCA_PATH_CACHE is not None:
+    LIBCA_PATH_CACHE = os.path.expanduser(LIBCA_PATH_CACHE)
+
 ## default timeout for connection
 #   This should be kept fairly short --
 #   as connection will be tried repeatedly
 DEFAULT_CONNECTION_TIMEOUT = 2.0
 
-## Cache of existing channel IDs:
-#  pvname: {'chid':chid, 'conn': isConnected,
-#           'ts': ts_conn, 'callbacks': [ user_callback... ])
-#  isConnected   = True/False: if connected.
-#  ts_conn       = ts of last connection event or failed attempt.
-#  user_callback = one or more user functions to be called on 
-#                  change (accumulated in the cache)
-_cache  = {}
+class _CacheEntry(object):
+    """connection data for one Channel in the channel cache:
+       pvname     name of PV
+       context    CA context the Channel was created in
+       chid       channel ID (dbr.chid_t), None until created
+       conn       True/False: if connected.
+       ts         ts of last connection event or failed attempt.
+       failures   number of failed connection attempts
+       callbacks  one or more user functions to be called on
+                  connection changes (accumulated in the cache)
+       event      threading.Event, set while connected.
+       refs       number of create_channel() calls not yet released
+       released   time when refs dropped to 0, or None
+    """
+    __slots__ = ('pvname', 'context', 'chid', 'conn', 'ts', 'failures',
+                 'callbacks', 'event', 'refs', 'released')
+
+    def __init__(self, pvname, context):
+        self.pvname = pvname
+        self.context = context
+        self.chid = None
+        self.conn = False
+        self.ts = 0
+        self.failures = 0
+        self.callbacks = []
+        self.event = threading.Event()
+        self.refs = 0
+        self.released = None
+
+class _ChannelCache(object):
+    """Cache of existing channel IDs, indexed both by (context, pvname)
+    and by chid, so that CA callbacks can find a Channel directly from
+    the chid they are given.  All changes to the indexes are made while
+    holding a lock, as they can happen in CA callback threads.
+
+    Channels that have been released by all their users are kept, in
+    order of release, in an idle list, from which they are reused or
+    evicted (see reclaim()).
+
+    The lock is never held while calling into libca."""
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._names = {}
+        self._chids = {}
+        self._idle = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, pvname, context):
+        "return entry for a pvname in a context, or None"
+        return self._names.get((context, pvname), None)
+
+    def get_chid(self, chid):
+        "return entry for a chid, or None"
+        if isinstance(chid, dbr.chid_t):
+            chid = chid.value
+        return self._chids.get(chid, None)
+
+    def find_pending(self, pvname):
+        "return an entry for a pvname in any context that has no chid yet"
+        with self.lock:
+            for (ctx, name), entry in self._names.items():
+                if name == pvname and entry.chid is None:
+                    return entry
+
+    def add(self, pvname, context):
+        "return entry for a pvname in a context, creating it if needed"
+        with self.lock:
+            key = (context, pvname)
+            entry = self._names.get(key, None)
+            if entry is None:
+                entry = self._names[key] = _CacheEntry(pvname, context)
+            return entry
+
+    def acquire(self, pvname, context):
+        """return entry for a pvname in a context, creating it if needed,
+        and add a reference to it"""
+        with self.lock:
+            entry = self._names.get((context, pvname), None)
+            if entry is None:
+                self.misses += 1
+                entry = self.add(pvname, context)
+            else:
+                self.hits += 1
+            entry.refs += 1
+            entry.released = None
+            self._idle.pop((context, pvname), None)
+            return entry
+
+    def release(self, entry):
+        "remove a reference to an entry, making it idle if it was the last"
+        with self.lock:
+            if entry.refs > 0:
+                entry.refs -= 1
+                if entry.refs == 0:
+                    entry.released = time.time()
+                    self._idle[(entry.context, entry.pvname)] = entry
+
+    def reclaim(self, context, maxsize=None, timeout=None):
+        """remove and return idle entries for a context that are beyond
+        maxsize entries in the cache, least recently released first, or
+        that have been idle for more than timeout seconds."""
+        out = []
+        if maxsize is None and timeout is None:
+            return out
+        now = time.time()
+        with self.lock:
+            for key, entry in list(self._idle.items()):
+                over = maxsize is not None and len(self._names) > maxsize
+                stale = (timeout is not None and
+                         now - entry.released > timeout)
+                if not (over or stale):
+                    break
+                if entry.context == context:
+                    self.remove(entry.pvname, entry.context)
+                    self.evictions += 1
+                    out.append(entry)
+        return out
 
-## Cache of pvs waiting for put to be done.
+    def set_chid(self, entry, chid):
+        "set the chid for an entry, and index the entry by chid"
+        with self.lock:
+            entry.chid = chid
+            self._chids[chid.value] = entry
+
+    def remove(self, pvname, context):
+        "remove and return the entry for a pvname in a context"
+        with self.lock:
+            entry = self._names.pop((context, pvname), None)
+            self._idle.pop((context, pvname), None)
+            if entry is not None and entry.chid is not None:
+                if self._chids.get(entry.chid.value, None) is entry:
+                    self._chids.pop(entry.chid.value)
+            return entry
+
+    def clear(self, context=None):
+        "remove all entries, or all entries for one context"
+        with self.lock:
+            for ctx, pvname in list(self._names.keys()):
+                if context is None or ctx == context:
+                    self.remove(pvname, ctx)
+
+    def entries(self, context=None):
+        "list of entries, optionally for one context only"
+        with self.lock:
+            return [entry for (ctx, pvname), entry in self._names.items()
+                    if context is None or ctx == context]
+
+    def info(self):
+        "dictionary of cache size and counters"
+        with self.lock:
+            return {'channels': len(self._names), 'idle': len(self._idle),
+                    'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions}
+
+    def __len__(self):
+        return len(self._names)
+
+_cache = _ChannelCache()
+
+## Puts waiting to be done.  Each PutRequest is passed as the user
+## argument of ca_array_put_callback, and is kept here until its
+## completion callback has run:  id(request): request
 _put_done =  {}
+
+class PutRequest(object):
+    """a put to a Channel that is waiting for its processing to complete,
+    as returned by put_request().
+       pvname   name of Channel
+       chid     channel id
+       status   ECA status of the completed put (None until done)
+       done     whether the put has completed
+    Use wait() to wait for this put, or wait_all() for many puts."""
+    __slots__ = ('pvname', 'chid', 'callback', 'callback_data',
+                 'event', 'status')
+
+    def __init__(self, pvname, chid, callback=None, callback_data=None):
+        self.pvname = pvname
+        self.chid = chid
+        self.callback = callback
+        self.callback_data = callback_data
+        self.event = threading.Event()
+        self.status = None
+
+    @property
+    def done(self):
+        "whether the put has completed"
+        return self.event.is_set()
+
+    def wait(self, timeout=30.0):
+        "wait up to timeout for the put to complete, returning done"
+        return _wait_event(self.event, timeout)
+
+    def __repr__(self):
+        return "<PutRequest '%s': %s>" % (self.pvname,
+                                          self.done and 'done' or 'pending')
+
+class _BufferPool(object):
+    """pool of reusable data buffers for array gets, keyed
+    by (ftype, count).  A buffer is taken from the pool for the
+    duration of a get, and given back after its data is unpacked,
+    so that the same buffer is never used by two gets at once.
+    At most maxfree unused buffers are kept for each key."""
+    def __init__(self, maxfree=4):
+        self.maxfree = maxfree
+        self.free = {}
+
+    def take(self, ftype, count):
+        "take a buffer from the pool, or allocate a new one"
+        try:
+            return self.free[(ftype, count)].pop()
+        except (KeyError, IndexError):
+            return (count*dbr.Map[ftype])()
+
+    def give(self, ftype, count, data):
+        "give a buffer back to the pool"
+        bufs = self.free.setdefault((ftype, count), [])
+        if len(bufs) < self.maxfree:
+            bufs.append(data)
+
+    def clear(self):
+        "release all unused buffers"
+        self.free.clear()
+
+_buffer_pool = _BufferPool()
         
 class ChannelAccessException(Exception):
     """Channel Access Exception: General Errors"""
@@ -136,10 +419,64 @@ class CASeverityException(Exception):
     def __str__(self):
         return " %s returned '%s'" % (self.fcn, self.msg)
 
-def find_libca():
+def _libca_cache_key():
+    "key for the libca path cache: the environment used to find libca"
+    import hashlib
+    env = [os.environ.get(name, '') for name in
+           ('PATH', 'LD_LIBRARY_PATH', 'DYLD_LIBRARY_PATH', 'EPICS_BASE')]
+    key = repr((sys.executable, sys.platform, os.path.abspath(__file__),
+                env, sys.path))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def _read_libca_cache(key):
+    "return cached path to libca for key, or None"
+    import json
+    if not LIBCA_PATH_CACHE:
+        return None
+    try:
+        with open(LIBCA_PATH_CACHE, 'r') as fh:
+            dllpath = json.load(fh).get(key, None)
+    except (IOError, OSError, ValueError, AttributeError):
+        return None
+    if dllpath is not None and os.path.isabs(dllpath):
+        if not os.path.exists(dllpath):
+            return None
+    return dllpath
+
+def _write_libca_cache(key, dllpath):
+    "save path to libca for key in the cache file"
+    import json
+    if not LIBCA_PATH_CACHE:
+        return
+    try:
+        with open(LIBCA_PATH_CACHE, 'r') as fh:
+            paths = json.load(fh)
+        if not isinstance(paths, dict):
+            paths = {}
+    except (IOError, OSError, ValueError):
+        paths = {}
+    paths[key] = dllpath
+    try:
+        cache_dir = os.path.dirname(LIBCA_PATH_CACHE)
+        if cache_dir and not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        tmpfile = '%s.%i' % (LIBCA_PATH_CACHE, os.getpid())
+        with open(tmpfile, 'w') as fh:
+            json.dump(paths, fh)
+        if os.name == 'nt' and os.path.exists(LIBCA_PATH_CACHE):
+            os.remove(LIBCA_PATH_CACHE)
+        os.rename(tmpfile, LIBCA_PATH_CACHE)
+    except (IOError, OSError):
+        pass
+
+def find_libca(use_cache=True):
     """
-    find location of ca dynamic library
+    find location of ca dynamic library.
+
+    With use_cache=True, a path found earlier in the same environment
+    is read from the file LIBCA_PATH_CACHE instead of being searched for.
     """
+    key = _libca_cache_key()
     search_path = [os.path.split( os.path.abspath(__file__))[0]]
     search_path.extend(sys.path)
     path_sep = ':'
@@ -152,8 +489,19 @@ def find_libca():
 
     os.environ['PATH'] = path_sep.join(search_path)  
 
+    dllpath = None
+    if use_cache:
+        dllpath = _read_libca_cache(key)
+    if dllpath is None:
+        dllpath = _search_libca(search_path)
+        _write_libca_cache(key, dllpath)
+    return dllpath
+
+def _search_libca(search_path):
+    "search for libca, raising ChannelAccessException if not found"
     # first, try the ctypes utility, which *should* work
     # with LD_LIBRARY_PATH or ldconfig 
+    import ctypes.util
     dllpath  = ctypes.util.find_library('ca')
     if dllpath is not None:
         return dllpath
@@ -202,34 +550,41 @@ def initialize_libca():
         
     dllname = find_libca()
     load_dll = ctypes.cdll.LoadLibrary
-    global libca
+    global libca, _array_get_keyed
     if os.name == 'nt':
         load_dll = ctypes.windll.LoadLibrary
     try:
         libca = load_dll(dllname)
+    except OSError:
+        # a cached path may be stale: search again
+        try:
+            libca = load_dll(find_libca(use_cache=False))
+        except:
+            raise ChannelAccessException('initialize_libca',
+                                         'Loading Epics CA DLL failed')
     except:
         raise ChannelAccessException('initialize_libca',
                                      'Loading Epics CA DLL failed')
-        
+
+    # set argtypes and return types for all libca functions used
+    for fname, (argtypes, restype) in _LIBCA_PROTOTYPES.items():
+        fcn = getattr(libca, fname)
+        if argtypes is not None:
+            fcn.argtypes = argtypes
+        fcn.restype = restype
+
+    # a second prototype of ca_array_get_callback() for get_many()
+    _array_get_keyed = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_long,
+                                        ctypes.c_ulong, _chid, _get_many_fcn,
+                                        ctypes.c_void_p)(
+                                            ('ca_array_get_callback', libca))
+
     ca_context = {False:0, True:1}[PREEMPTIVE_CALLBACK]
     ret = libca.ca_context_create(ca_context)
     if ret != dbr.ECA_NORMAL:
         raise ChannelAccessException('initialize_libca',
                                      'Cannot create Epics CA Context')
 
-    # set argtypes and non-default return types
-    # for several libca functions here
-    libca.ca_pend_event.argtypes  = [ctypes.c_double]
-    libca.ca_pend_io.argtypes     = [ctypes.c_double]
-    libca.ca_client_status.argtypes = [ctypes.c_void_p, ctypes.c_long]
-    libca.ca_sg_block.argtypes    = [ctypes.c_ulong, ctypes.c_double]
-
-    libca.ca_current_context.restype = ctypes.c_void_p
-    libca.ca_version.restype   = ctypes.c_char_p
-    libca.ca_host_name.restype = ctypes.c_char_p
-    libca.ca_name.restype      = ctypes.c_char_p
-    libca.ca_message.restype   = ctypes.c_char_p
-
     # save value offests used for unpacking
     # TIME and CTRL data as an array in dbr module
     dbr.value_offset = (39*ctypes.c_short).in_dll(libca,'dbr_value_offset')
@@ -244,17 +599,17 @@ def finalize_libca(maxtime=10.0):
     then flush_io() and poll() a few times.
     """
     global libca
-    global _cache
     if libca is None:
         return
     try:
         start_time = time.time()
         flush_io()
         poll()
-        for ctx in _cache.values():
-            for key in list(ctx.keys()):
-                ctx.pop(key)
         _cache.clear()
+        with _subscriptions_lock:
+            _subscriptions.clear()
+            _ctrlvars.clear()
+            _batch_subscriptions.clear()
         flush_count = 0
         while (flush_count < 5 and
                time.time()-start_time < maxtime):
@@ -271,12 +626,11 @@ def show_cache(print_out=True):
     out = []
     out.append('#  PV name    Is Connected?   Channel ID  Context')
     out.append('#---------------------------------------')
-    global _cache
-    for context, context_chids in  list(_cache.items()):
-        for vname, val in list(context_chids.items()):
-            out.append(" %s  %s  %i" % (vname,
-                                        repr(isConnected(val['chid'])),
-                                        context))
+    for entry in _cache.entries():
+        if entry.chid is not None:
+            out.append(" %s  %s  %i" % (entry.pvname,
+                                        repr(isConnected(entry.chid)),
+                                        entry.context))
     out = strjoin('\n', out)
     if print_out:
         write(out)
@@ -386,8 +740,184 @@ def withSEVCHK(fcn):
 
 ##
 ## Event Handlers for get() event callbacks
+class _EventContext(object):
+    """precomputed data for a subscription, used as the user argument
+    for ca_create_subscription so that _onGetEvent does not need to look
+    up the pvname or test which attributes the DBR type has each time.
+    Calling the context with the event_handler_args runs the callback."""
+    __slots__ = ('callback', 'pvname', 'ftype', 'ntype', 'dtype',
+                 'attrs', 'enum_strs', 'is_time')
+
+    def __init__(self, callback, chid, ftype):
+        self.callback = callback
+        self.pvname = name(chid)
+        self.ftype = ftype
+        self.ntype = native_type(ftype)
+        self.dtype = dbr.Map[ftype]
+        self.is_time = dbr.TIME_STRING <= ftype < dbr.CTRL_STRING
+        self.attrs = ()
+        self.enum_strs = False
+        if ftype >= dbr.CTRL_STRING:
+            self.attrs = tuple([attr for attr in dbr.ctrl_limits +
+                                ('precision', 'units', 'severity')
+                                if hasattr(self.dtype, attr)])
+            self.enum_strs = (hasattr(self.dtype, 'strs') and
+                              hasattr(self.dtype, 'no_str'))
+
+    def __call__(self, args):
+        "run callback for an event"
+        count = args.count
+        kwds = {'ftype': args.type, 'count': count, 'chid': args.chid,
+                'pvname': self.pvname, 'status': args.status}
+        if count == 1 and self.ntype != dbr.STRING:
+            tmpv = self.dtype.from_address(args.raw_dbr)
+            value = tmpv.value
+        else:
+            value = dbr.cast_args(args).contents
+            tmpv = value[0]
+            nelem = count
+            if self.ntype == dbr.STRING:
+                nelem = dbr.MAX_STRING_SIZE
+            value = _unpack(value, count=nelem, ftype=self.ftype)
+        if self.is_time:
+            stamp = tmpv.stamp
+            kwds['status'] = tmpv.status
+            kwds['severity'] = tmpv.severity
+            kwds['timestamp'] = (_EPOCH + stamp.secs +
+                                 1.e-6*(stamp.nsec//1000))
+        elif self.attrs:
+            for attr in self.attrs:
+                kwds[attr] = getattr(tmpv, attr)
+            if self.enum_strs and tmpv.no_str > 0:
+                kwds['enum_strs'] = tuple([tmpv.strs[i].value for
+                                           i in range(tmpv.no_str)])
+        if self.callback is not None:
+            self.callback(value=value, **kwds)
+
+_EPOCH = dbr.EPICS2UNIX_EPOCH
+
+class _BatchContext(_EventContext):
+    """context for a BatchSubscription: each event is added to a numpy
+    structured array, which is passed to the callback when it holds
+    batch_size events, or when window seconds have passed since the
+    first event in it."""
+    __slots__ = ('chid', 'batch_size', 'window', 'events', 'nevents',
+                 'batchno', 'context', 'lock')
+
+    def __init__(self, callback, chid, ftype, batch_size, window):
+        _EventContext.__init__(self, callback, chid, ftype)
+        self.chid = chid
+        self.batch_size = batch_size
+        self.window = window
+        self.context = current_context()
+        self.lock = threading.Lock()
+        self.batchno = 0
+        self.nevents = 0
+        self.events = numpy.empty(batch_size, dtype=_batch_dtype(self.ntype))
+
+    def __call__(self, args):
+        "add an event to the batch, running the callback when it is done"
+        tmpv = self.dtype.from_address(args.raw_dbr)
+        stamp = tmpv.stamp
+        event = (tmpv.value, tmpv.severity, tmpv.status,
+                 _EPOCH + stamp.secs + 1.e-6*(stamp.nsec//1000))
+        with self.lock:
+            nevents = self.nevents
+            self.events[nevents] = event
+            self.nevents = nevents = nevents + 1
+            if nevents == 1 and self.window is not None:
+                # the batch is passed on when the window ends, even if
+                # no more events arrive
+                _scheduler.call_at(time.time() + self.window, self.context,
+                                   self.flush, self.batchno)
+            if nevents < self.batch_size:
+                return
+            events = self._take()
+        self.callback(pvname=self.pvname, chid=self.chid, events=events)
+
+    def flush(self, batchno=None):
+        """run the callback with the events in the batch, if any.  With
+        batchno, only if the batch is still the one with that number."""
+        with self.lock:
+            if self.nevents == 0 or batchno not in (None, self.batchno):
+                return
+            events = self._take()
+        self.callback(pvname=self.pvname, chid=self.chid, events=events)
+
+    def _take(self):
+        """return the events in the batch, and start a new one.  The
+        lock must be held."""
+        events = self.events[:self.nevents]
+        self.events = numpy.empty(self.batch_size, dtype=self.events.dtype)
+        self.nevents = 0
+        self.batchno += 1
+        return events
+
+class _Scheduler(object):
+    """a single thread that runs calls at given times, used to pass on
+    the held events of pv.EventFilters and the batches of
+    BatchSubscriptions.  Each call is run attached to the CA context it
+    was scheduled from."""
+    def __init__(self):
+        self._calls = []   # heap of (time, seq, context, fcn, args)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def call_at(self, when, context, fcn, *args):
+        "run fcn(*args) at time when"
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._calls,
+                           (when, self._seq, context, fcn, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='epics-scheduler')
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        "scheduler thread: run calls as they become due"
+        attached = None
+        while True:
+            with self._cond:
+                while True:
+                    wait = None
+                    if self._calls:
+                        wait = self._calls[0][0] - time.time()
+                        if wait <= 0:
+                            break
+                    self._cond.wait(wait)
+                when, seq, context, fcn, args = heapq.heappop(self._calls)
+            if context is not None and context != attached:
+                if attached is not None:
+                    detach_context()
+                attach_context(context)
+                attached = context
+            # there is no caller to pass an error to: report it and
+            # go on with the other calls
+            try:
+                fcn(*args)
+            except Exception:
+                traceback.print_exc()
+
+_scheduler = _Scheduler()
+
+def _batch_dtype(ntype):
+    "numpy dtype of events for a BatchSubscription to a native type"
+    if ntype == dbr.STRING:
+        vtype = 'S%i' % dbr.MAX_STRING_SIZE
+    else:
+        vtype = numpy.dtype(dbr.Map[ntype])
+    return numpy.dtype([('value', vtype), ('severity', 'i2'),
+                        ('status', 'i2'), ('timestamp', 'f8')])
+
 def _onGetEvent(args):
     """Internal Event Handler for get events: not intended for use"""
+    usr = args.usr
+    if isinstance(usr, _EventContext) and usr.ftype == args.type:
+        return usr(args)
     value = dbr.cast_args(args).contents
     # chid = dbr.chid_t(args.chid)
     pvname = name(args.chid)
@@ -423,59 +953,122 @@ def _onGetEvent(args):
 def _onConnectionEvent(args):
     """set flag in cache holding whteher channel is
     connected. if provided, run a user-function"""
-    ctx = current_context()
-    pvname = name(args.chid)
-    global _cache
-    if ctx is None and len(_cache.keys()) > 0:
-        ctx = _cache.keys()[0]
-    if ctx not in _cache:
-        _cache[ctx] = {}
-    if pvname not in _cache[ctx]:
-        _cache[ctx][pvname] = {'conn':False, 'chid': args.chid,
-                               'ts':0, 'failures':0, 
-                               'callbacks': []}
-
-    conn = (args.op == dbr.OP_CONN_UP)
-    entry = _cache[ctx][pvname]
-    if (isinstance(entry['chid'], dbr.chid_t) and 
-        entry['chid'].value != args.chid):
+    entry = _cache.get_chid(args.chid)
+    if entry is None:
+        # the callback can run before create_channel() has indexed
+        # the new chid: find the entry by name.
+        pvname = name(args.chid)
+        entry = _cache.get(pvname, current_context())
+        if entry is None:
+            entry = _cache.find_pending(pvname)
+        if entry is None:
+            entry = _cache.add(pvname, current_context())
+        if entry.chid is None:
+            _cache.set_chid(entry, dbr.chid_t(args.chid))
+
+    if entry.chid.value != args.chid:
         msg = 'Channel IDs do not match in connection callback (%s and %s)'
         raise ChannelAccessException('connect_channel',
-                                     msg % (entry['chid'], args.chid))
-    entry['conn'] = conn
-    entry['chid'] = args.chid
-    entry['ts']   = time.time()
-    entry['failures'] = 0
+                                     msg % (entry.chid, args.chid))
+    conn = (args.op == dbr.OP_CONN_UP)
+    entry.conn = conn
+    entry.ts   = time.time()
+    entry.failures = 0
+    if conn:
+        entry.event.set()
+    else:
+        entry.event.clear()
 
-    if len(entry.get('callbacks', [])) > 0:
+    if len(entry.callbacks) > 0:
         poll(evt=1.e-3, iot=10.0)
-        for callback in entry.get('callbacks', []):
+        for callback in list(entry.callbacks):
             if hasattr(callback, '__call__'):
-                callback(pvname=pvname, 
-                         chid=entry['chid'],
-                         conn=entry['conn'])
+                callback(pvname=entry.pvname, 
+                         chid=args.chid,
+                         conn=entry.conn)
 
     return 
 
 ## put event handler:
 def _onPutEvent(args, **kwds):
-    """set put-has-completed for this channel,
+    """set put-has-completed for this put request,
     call optional user-supplied callback"""
-    pvname = name(args.chid)
-    fcn  = _put_done[pvname][1]
-    data = _put_done[pvname][2]
-    _put_done[pvname] = (True, None, None)
+    request = args.usr
+    _put_done.pop(id(request), None)
+    request.status = args.status
+    fcn, data = request.callback, request.callback_data
+    request.callback = request.callback_data = None
+    request.event.set()
     if hasattr(fcn, '__call__'):
         if isinstance(data, dict):
             kwds.update(data)
         elif data is not None:
             kwds['data'] = data
-        fcn(pvname=pvname, **kwds)
+        fcn(pvname=request.pvname, **kwds)
 
 # create global reference to these two callbacks
-_CB_CONNECT = ctypes.CFUNCTYPE(None, dbr.connection_args)(_onConnectionEvent)
-_CB_PUTWAIT = ctypes.CFUNCTYPE(None, dbr.event_handler_args)(_onPutEvent)  
-_CB_EVENT   = ctypes.CFUNCTYPE(None, dbr.event_handler_args)(_onGetEvent)   
+_connection_fcn = ctypes.CFUNCTYPE(None, dbr.connection_args)
+_event_fcn      = ctypes.CFUNCTYPE(None, dbr.event_handler_args)
+_CB_CONNECT = _connection_fcn(_onConnectionEvent)
+_CB_PUTWAIT = _event_fcn(_onPutEvent)  
+_CB_EVENT   = _event_fcn(_onGetEvent)   
+
+## argtypes and restype for each libca function used, set by
+## initialize_libca().  argtypes of None leaves arguments unchecked.
+_chid = dbr.chid_t
+_LIBCA_PROTOTYPES = {
+    # contexts
+    'ca_context_create':  ([ctypes.c_int], ctypes.c_int),
+    'ca_context_destroy': ([], None),
+    'ca_attach_context':  ([ctypes.c_void_p], ctypes.c_int),
+    'ca_detach_context':  ([], None),
+    'ca_current_context': ([], ctypes.c_void_p),
+    'ca_context_status':  ([ctypes.c_void_p, ctypes.c_uint], ctypes.c_int),
+    'ca_replace_printf_handler': (None, ctypes.c_int),
+    # general functions
+    'ca_flush_io':   ([], ctypes.c_int),
+    'ca_message':    ([ctypes.c_long], ctypes.c_char_p),
+    'ca_version':    ([], ctypes.c_char_p),
+    'ca_pend_io':    ([ctypes.c_double], ctypes.c_int),
+    'ca_pend_event': ([ctypes.c_double], ctypes.c_int),
+    'ca_test_io':    ([], ctypes.c_int),
+    # channels
+    'ca_create_channel': ([ctypes.c_char_p, _connection_fcn, ctypes.c_void_p,
+                           ctypes.c_uint, ctypes.POINTER(_chid)], ctypes.c_int),
+    'ca_clear_channel':  ([_chid], ctypes.c_int),
+    'ca_name':           ([_chid], ctypes.c_char_p),
+    'ca_host_name':      ([_chid], ctypes.c_char_p),
+    'ca_element_count':  ([_chid], ctypes.c_ulong),
+    'ca_read_access':    ([_chid], ctypes.c_uint),
+    'ca_write_access':   ([_chid], ctypes.c_uint),
+    'ca_field_type':     ([_chid], ctypes.c_short),
+    'ca_state':          ([_chid], ctypes.c_int),
+    # get, put, subscriptions
+    'ca_array_get': ([ctypes.c_long, ctypes.c_ulong, _chid, ctypes.c_void_p],
+                     ctypes.c_int),
+    'ca_array_get_callback': ([ctypes.c_long, ctypes.c_ulong, _chid,
+                               _event_fcn, dbr.py_obj], ctypes.c_int),
+    'ca_array_put': ([ctypes.c_long, ctypes.c_ulong, _chid, ctypes.c_void_p],
+                     ctypes.c_int),
+    'ca_array_put_callback': ([ctypes.c_long, ctypes.c_ulong, _chid,
+                               ctypes.c_void_p, _event_fcn, dbr.py_obj],
+                              ctypes.c_int),
+    'ca_create_subscription': ([ctypes.c_long, ctypes.c_ulong, _chid,
+                                ctypes.c_long, _event_fcn, dbr.py_obj,
+                                ctypes.POINTER(ctypes.c_void_p)],
+                               ctypes.c_int),
+    'ca_clear_subscription': ([ctypes.c_void_p], ctypes.c_int),
+    # synchronous groups
+    'ca_sg_create': ([ctypes.POINTER(ctypes.c_ulong)], ctypes.c_int),
+    'ca_sg_delete': ([ctypes.c_ulong], ctypes.c_int),
+    'ca_sg_block':  ([ctypes.c_ulong, ctypes.c_double], ctypes.c_int),
+    'ca_sg_test':   ([ctypes.c_ulong], ctypes.c_int),
+    'ca_sg_reset':  ([ctypes.c_ulong], ctypes.c_int),
+    'ca_sg_array_get': ([ctypes.c_ulong, ctypes.c_long, ctypes.c_ulong, _chid,
+                         ctypes.c_void_p], ctypes.c_int),
+    'ca_sg_array_put': ([ctypes.c_ulong, ctypes.c_long, ctypes.c_ulong, _chid,
+                         ctypes.c_void_p], ctypes.c_int),
+    }
 
 ###
 # 
@@ -498,20 +1091,22 @@ def context_create(context=None):
 @withCA
 def context_destroy():
     "destroy current context"
-    global _cache
     ctx = current_context() 
+    chids = [entry.chid for entry in _cache.entries(context=ctx)
+             if entry.chid is not None]
     ret = libca.ca_context_destroy()
-    if ctx in _cache:
-        for key in list(_cache[ctx].keys()):
-            _cache[ctx].pop(key)
-        _cache.pop(ctx)
+    _cache.clear(context=ctx)
+    # no more callbacks can come from the destroyed context
+    _drop_subscriptions(chids)
     return ret
     
 @withCA
 def attach_context(context):
     "attach a context"        
     ret = libca.ca_attach_context(context) 
-    return PySEVCHK('attach_context', ret, dbr.ECA_ISATTACHED)
+    if ret == dbr.ECA_ISATTACHED:
+        return ret
+    return PySEVCHK('attach_context', ret)
         
 @withCA
 def detach_context():
@@ -537,7 +1132,7 @@ def current_context():
 @withCA
 def client_status(context, level):
     "return status of client"
-    return libca.ca_client_status(context, level)
+    return libca.ca_context_status(context, level)
 
 @withCA
 def flush_io():
@@ -578,6 +1173,23 @@ def poll(evt=1.e-4, iot=1.0):
     pend_event(evt)
     return pend_io(iot)    
 
+def _wait_event(event, timeout):
+    """wait (up to timeout) for a threading.Event that is set from a CA
+    callback, returning whether it has been set.
+
+    With preemptive callbacks, this blocks without using any CPU until
+    the event is set.  Without preemptive callbacks, CA callbacks are
+    only run by pend_event(), so poll() is used while waiting."""
+    if PREEMPTIVE_CALLBACK:
+        flush_io()
+        event.wait(timeout)
+    else:
+        start_time = time.time()
+        while (not event.is_set() and
+               (time.time()-start_time) < timeout):
+            poll()
+    return event.is_set()
+
 @withCA
 def test_io():
     """test if IO is complete: returns True if it is"""
@@ -602,6 +1214,15 @@ def create_channel(pvname, connect=False, callback=None):
     If the channel is already connected for the PV name, the callback
     will be called immediately.
     """
+    chid = _create_channel(pvname, callback=callback)
+    if connect:
+        connect_channel(chid)
+    poll()
+    return chid
+
+def _create_channel(pvname, callback=None):
+    """create (or look up) the chid for a pvname, without waiting
+    for the connection or polling: see create_channel()"""
     # 
     # Note that _CB_CONNECT (defined below) is a global variable, holding
     # a reference to _onConnectionEvent:  This is really the connection
@@ -609,37 +1230,105 @@ def create_channel(pvname, connect=False, callback=None):
     # and called by _onConnectionEvent.
     pvn = STR2BYTES(pvname)    
     ctx = current_context()
-    global _cache
-    if ctx not in _cache:
-        _cache[ctx] = {}
-    if pvname not in _cache[ctx]: # new PV for this context
-        entry = {'conn':False,  'chid': None, 
-                 'ts': 0,  'failures':0, 
-                 'callbacks': [ callback ]}
-        _cache[ctx][pvname] = entry
-    else:
-        entry = _cache[ctx][pvname]
-        if not entry['conn'] and callback is not None: # pending connection
-            _cache[ctx][pvname]['callbacks'].append(callback)
-        elif (hasattr(callback, '__call__') and 
-              not callback in entry['callbacks']):
-            entry['callbacks'].append(callback)
-            callback(chid=entry['chid'], conn=entry['conn'])
-
-    if entry.get('chid', None) is not None:
+    entry = _cache.acquire(pvname, ctx)
+    _reclaim_channels(ctx)
+    if not entry.conn: # new PV or pending connection
+        if callback is not None:
+            entry.callbacks.append(callback)
+    elif (hasattr(callback, '__call__') and 
+          not callback in entry.callbacks):
+        entry.callbacks.append(callback)
+        chid = entry.chid
+        if chid is not None:
+            chid = chid.value
+        callback(chid=chid, conn=entry.conn)
+
+    if entry.chid is not None:
         # already have or waiting on a chid
-        chid = _cache[ctx][pvname]['chid']
-    else:
-        chid = dbr.chid_t()
-        ret = libca.ca_create_channel(pvn, _CB_CONNECT, 0, 0,
+        return entry.chid
+    chid = dbr.chid_t()
+    ret = libca.ca_create_channel(pvn, _CB_CONNECT, 0, 0,
                                   ctypes.byref(chid))
-        PySEVCHK('create_channel', ret)
-        entry['chid'] = chid
+    PySEVCHK('create_channel', ret)
+    with _cache.lock:
+        # the connection callback may have set the chid already
+        if entry.chid is None:
+            _cache.set_chid(entry, chid)
+    return entry.chid
 
-    if connect:
-        connect_channel(chid)
-    poll()
-    return chid
+@withCHID
+def release_channel(chid, callback=None):
+    """release a Channel created with create_channel(), removing the
+    connection callback given there.
+
+    A Channel released by all of its users is kept open so that it can be
+    used again, until it is cleared because of CHANNEL_CACHE_SIZE or
+    CHANNEL_IDLE_TIMEOUT."""
+    entry = _cache.get_chid(chid)
+    if entry is None:
+        return
+    if callback is not None and callback in entry.callbacks:
+        entry.callbacks.remove(callback)
+    _cache.release(entry)
+    _reclaim_channels(entry.context)
+
+def _reclaim_channels(context):
+    "clear idle Channels beyond CHANNEL_CACHE_SIZE or CHANNEL_IDLE_TIMEOUT"
+    chids = [entry.chid for entry in
+             _cache.reclaim(context, maxsize=CHANNEL_CACHE_SIZE,
+                            timeout=CHANNEL_IDLE_TIMEOUT)
+             if entry.chid is not None]
+    dropped = _drop_subscriptions(chids)
+    for chid in chids:
+        libca.ca_clear_channel(chid)
+    del dropped
+
+def channel_cache_info():
+    """return dictionary of the number of cached Channels ('channels'),
+    the number of those that have been released ('idle'), and counts of
+    create_channel() calls that found a cached Channel ('hits') or
+    created a new one ('misses'), and of Channels cleared ('evictions')"""
+    return _cache.info()
+
+@withCA
+def connect_many(pvnames, timeout=None, callback=None):
+    """create and connect Channels for a list of pvnames, waiting
+    (up to timeout) once for all of them, instead of once per Channel.
+
+    All Channels are created first, and then a single shared deadline
+    is used to wait for connections, so that the time taken depends
+    on the slowest IOC, not on the number of PVs.
+
+    An optional connection callback is used as for create_channel().
+
+    returns a tuple of two dictionaries (connected, unconnected), each
+    mapping pvname to chid.
+    """
+    if timeout is None:
+        timeout = DEFAULT_CONNECTION_TIMEOUT
+    chids = {}
+    for pvname in pvnames:
+        if pvname not in chids:
+            chids[pvname] = _create_channel(pvname, callback=callback)
+    flush_io()
+
+    connected, pending = {}, {}
+    start_time = time.time()
+    for pvname, chid in chids.items():
+        if state(chid) != dbr.CS_CONN:
+            remaining = max(0, timeout - (time.time()-start_time))
+            _wait_event(_cache.get_chid(chid).event, remaining)
+        if state(chid) == dbr.CS_CONN:
+            connected[pvname] = chid
+        else:
+            pending[pvname] = chid
+
+    now = time.time()
+    for chid in pending.values():
+        entry = _cache.get_chid(chid)
+        entry.ts = now
+        entry.failures += 1
+    return connected, pending
 
 @withCHID
 def connect_channel(chid, timeout=None, verbose=False):
@@ -663,20 +1352,20 @@ def connect_channel(chid, timeout=None, verbose=False):
         # not connected yet, either indicating a slow network
         # or a truly un-connnectable channel.
         start_time = time.time()
-        ctx = current_context()
-        pvname = name(chid)
-        global _cache
-        if ctx not in _cache:
-            _cache[ctx] = {}
+        entry = _cache.get_chid(chid)
 
         if timeout is None:
             timeout = DEFAULT_CONNECTION_TIMEOUT
-        while (not conn and ((time.time()-start_time) < timeout)):
-            poll()
-            conn = (state(chid) == dbr.CS_CONN)
-        if not conn:
-            _cache[ctx][pvname]['ts'] = time.time()
-            _cache[ctx][pvname]['failures'] += 1
+        if entry is not None:
+            _wait_event(entry.event, timeout)
+        else:
+            while (not conn and ((time.time()-start_time) < timeout)):
+                poll()
+                conn = (state(chid) == dbr.CS_CONN)
+        conn = (state(chid) == dbr.CS_CONN)
+        if not conn and entry is not None:
+            entry.ts = time.time()
+            entry.failures += 1
     return conn
 
 # functions with very light wrappings:
@@ -713,7 +1402,13 @@ def field_type(chid):
 @withCHID
 def clear_channel(chid):
     "clear channel"    
-    return libca.ca_clear_channel(chid)
+    entry = _cache.get_chid(chid)
+    if entry is not None:
+        _cache.remove(entry.pvname, entry.context)
+    dropped = _drop_subscriptions([chid])
+    ret = libca.ca_clear_channel(chid)
+    del dropped
+    return ret
 
 @withCHID
 def state(chid):
@@ -751,9 +1446,24 @@ def native_type(ftype):
         ntype -= dbr.TIME_STRING
     return ntype
 
-def _unpack(data, count=None, chid=None, ftype=None, as_numpy=True):
+def _unpack_ndarray(data, count, ntype, offset=0, own_data=False):
+    """return array data from a DBR buffer as a numpy ndarray, starting
+    offset bytes into the buffer.  With own_data=True, the ndarray uses
+    the buffer itself, otherwise a single copy is made."""
+    out = numpy.frombuffer(data, dtype=numpy.dtype(dbr.Map[ntype]),
+                           count=count, offset=offset)
+    if not own_data:
+        out = out.copy()
+    return out
+
+def _unpack(data, count=None, chid=None, ftype=None, as_numpy=True,
+            own_data=False):
     """unpack raw data returned from an array get or
-    subscription callback"""
+    subscription callback.
+
+    own_data=True means that data was allocated by the caller and
+    is not used elsewhere, so that with ZERO_COPY_ARRAYS, the returned
+    numpy array can use it without copying."""
     def unpack_simple(data, count, ntype, use_numpy):
         "simple, native data type"
         if count == 1 and ntype != dbr.STRING:
@@ -771,6 +1481,8 @@ def _unpack(data, count=None, chid=None, ftype=None, as_numpy=True):
             else:
                 return out
         # waveform data:
+        if use_numpy and ZERO_COPY_ARRAYS:
+            return _unpack_ndarray(data, count, ntype, own_data=own_data)
         if ntype == dbr.CHAR:
             if use_numpy:
                 data = numpy.array(data)
@@ -786,6 +1498,10 @@ def _unpack(data, count=None, chid=None, ftype=None, as_numpy=True):
             if ntype == dbr.STRING and '\x00' in out:
                 out = out[:out.index('\x00')]
             return out
+        if use_numpy and ZERO_COPY_ARRAYS:
+            return _unpack_ndarray(data, count, ntype,
+                                   offset=dbr.value_offset[ftype],
+                                   own_data=own_data)
         # fix for CTRL / TIME array data:Thanks to Glen Wright !
         out = (count*dbr.Map[ntype]).from_address(ctypes.addressof(data) +
                                                   dbr.value_offset[ftype])
@@ -799,10 +1515,6 @@ def _unpack(data, count=None, chid=None, ftype=None, as_numpy=True):
         
         return list(out)
 
-    unpack = unpack_simple
-    if ftype >= dbr.TIME_STRING:
-        unpack = unpack_ctrltime
-
     if count is None and chid is not None:
         count = element_count(chid)
     if count is None:
@@ -813,13 +1525,18 @@ def _unpack(data, count=None, chid=None, ftype=None, as_numpy=True):
     if ftype is None:
         ftype = dbr.INT
 
+    unpack = unpack_simple
+    if ftype >= dbr.TIME_STRING:
+        unpack = unpack_ctrltime
+
     ntype = native_type(ftype)
     use_numpy = (count > 1 and HAS_NUMPY and as_numpy and
                  ntype != dbr.STRING)
     return unpack(data, count, ntype, use_numpy)
 
 @withConnectedCHID
-def get(chid, ftype=None, as_string=False, count=None, as_numpy=True):
+def get(chid, ftype=None, as_string=False, count=None, as_numpy=True,
+        out=None):
     """return the current value for a Channel.  Options are
        ftype       field type to use (native type is default)
        as_string   flag(True/False) to get a string representation
@@ -827,6 +1544,9 @@ def get(chid, ftype=None, as_string=False, count=None, as_numpy=True):
                    featured as for a PV -- see pv.py for more details.
        as_numpy    flag(True/False) to use numpy array as the
                    return type for array data.       
+       out         numpy array to fill with the data, which is then
+                   returned.  If its dtype matches the native type,
+                   the data is written directly into it.
     """
     if ftype is None:
         ftype = field_type(chid)
@@ -836,8 +1556,21 @@ def get(chid, ftype=None, as_string=False, count=None, as_numpy=True):
         count = element_count(chid)
     else:
         count = min(count, element_count(chid))
-       
-    data = (count*dbr.Map[ftype])()
+    if out is not None:
+        if not HAS_NUMPY or native_type(ftype) == dbr.STRING:
+            raise ChannelAccessException('get',
+                                 'out can only be used for numeric data')
+        count = min(count, out.size)
+
+    pooled = USE_BUFFER_POOL and count > 1
+    if (out is not None and ftype < dbr.TIME_STRING and
+        out.flags['C_CONTIGUOUS'] and out.flags['WRITEABLE'] and
+        out.dtype == numpy.dtype(dbr.Map[ftype])):
+        pooled, data = False, out.ctypes.data_as(ctypes.c_void_p)
+    elif pooled:
+        data = _buffer_pool.take(ftype, count)
+    else:
+        data = (count*dbr.Map[ftype])()
 
     ret = libca.ca_array_get(ftype, count, chid, data)
     PySEVCHK('get', ret)
@@ -846,11 +1579,123 @@ def get(chid, ftype=None, as_string=False, count=None, as_numpy=True):
         tcount = min(count, 1000)
         poll(evt=tcount*1.e-5, iot=tcount*0.01)
 
-    val = _unpack(data, count=count, ftype=ftype, as_numpy=as_numpy)
+    if out is not None:
+        if isinstance(data, ctypes.Array):
+            offset = 0
+            if ftype >= dbr.TIME_STRING:
+                offset = dbr.value_offset[ftype]
+            out.flat[:count] = _unpack_ndarray(data, count,
+                                               native_type(ftype),
+                                               offset=offset, own_data=True)
+        if pooled:
+            _buffer_pool.give(ftype, count, data)
+        return out
+
+    val = _unpack(data, count=count, ftype=ftype, as_numpy=as_numpy,
+                  own_data=not pooled)
+    if pooled:
+        _buffer_pool.give(ftype, count, data)
     if as_string:
         val = _as_string(val, chid, count, ftype)
     return val
 
+## get_many() requests waiting for their callback, keyed by the integer
+## passed to libca as usr.  A reply arriving after get_many() has given
+## up finds no entry and is ignored.
+_pending_gets = {}
+_get_keys = itertools.count(1)
+
+class _get_many_args(ctypes.Structure):
+    "event handler arguments for get_many(): usr is an integer key"
+    _fields_ = [('usr', ctypes.c_void_p)] + dbr.event_handler_args._fields_[1:]
+
+class _GetRequest(object):
+    """a get for get_many(), sent with ca_array_get_callback: the
+    callback copies the data into the request's buffer."""
+    __slots__ = ('key', 'data', 'status', 'event')
+
+    def __init__(self, data):
+        self.key = next(_get_keys)
+        self.data = data
+        self.status = dbr.ECA_TIMEOUT
+        self.event = threading.Event()
+
+    def complete(self, args):
+        "copy data from a get callback"
+        if args.status == dbr.ECA_NORMAL:
+            ctypes.memmove(self.data, args.raw_dbr, ctypes.sizeof(self.data))
+        self.status = args.status
+        self.event.set()
+
+def _onGetManyEvent(args):
+    """Internal Event Handler for get_many(): not intended for use"""
+    request = _pending_gets.pop(args.usr, None)
+    if request is not None:
+        request.complete(args)
+
+_get_many_fcn = ctypes.CFUNCTYPE(None, _get_many_args)
+_CB_GETMANY = _get_many_fcn(_onGetManyEvent)
+
+## ca_array_get_callback() with an integer usr, set by initialize_libca()
+_array_get_keyed = None
+
+@withCA
+def get_many(chids, ftype=None, as_string=False, count=None,
+             as_numpy=True, timeout=5.0):
+    """return the current values for a list of Channels, sending all
+    requests before waiting for any of them.  Options are as for get(),
+    with ftype and count applied to every Channel, and
+       timeout     maximum time to wait for all data to arrive.
+
+    Returns a list of (value, status) tuples in the order of the
+    input chids, where status is dbr.ECA_NORMAL on success.  For
+    Channels that are not connected or whose data did not arrive,
+    value will be None and status will be the CA status code.
+    """
+    requests = []
+    for chid in chids:
+        if isinstance(chid, int):
+            chid = dbr.chid_t(chid)
+        if not isConnected(chid):
+            requests.append((chid, None, None, None, dbr.ECA_DISCONN))
+            continue
+        thistype = ftype
+        if thistype is None:
+            thistype = field_type(chid)
+        thiscount = element_count(chid)
+        if count is not None:
+            thiscount = min(count, thiscount)
+        request = _GetRequest((thiscount*dbr.Map[thistype])())
+        _pending_gets[request.key] = request
+        ret = _array_get_keyed(thistype, thiscount, chid,
+                               _CB_GETMANY, request.key)
+        if ret != dbr.ECA_NORMAL:
+            _pending_gets.pop(request.key, None)
+        requests.append((chid, thistype, thiscount, request, ret))
+
+    flush_io()
+    start_time = time.time()
+    for chid, thistype, thiscount, request, ret in requests:
+        if ret == dbr.ECA_NORMAL:
+            _wait_event(request.event,
+                        max(0, timeout - (time.time()-start_time)))
+    for chid, thistype, thiscount, request, ret in requests:
+        if request is not None:
+            _pending_gets.pop(request.key, None)
+    out = []
+    for chid, thistype, thiscount, request, ret in requests:
+        if ret == dbr.ECA_NORMAL:
+            ret = request.status
+        if ret != dbr.ECA_NORMAL:
+            out.append((None, ret))
+            continue
+        val = _unpack(request.data, count=thiscount, ftype=thistype,
+                      as_numpy=as_numpy, own_data=True)
+        if as_string:
+            val = _as_string(val, chid, thiscount, thistype)
+        out.append((val, ret))
+    return out
+
 def _as_string(val, chid, count, ftype):
     "primitive conversion of value to a string"
     try:
@@ -866,6 +1711,111 @@ def _as_string(val, chid, count, ftype):
         pass            
     return val
                     
+def _cast_array(value, ftype, fcn_name='put'):
+    """convert a numpy array to the type of a Channel for a put,
+    returning a contiguous 1-d array.  Casts that are not 'safe' in
+    numpy's sense are done only for integers and floats, and only after
+    checking that every value fits in the Channel's type.  Other arrays
+    are returned as lists, to be converted element by element."""
+    dtype = numpy.dtype(dbr.Map[ftype])
+    if not numpy.can_cast(value.dtype, dtype, 'safe'):
+        if value.dtype.kind in 'biu' and dtype.kind in 'iu':
+            limits, check = numpy.iinfo(dtype), value
+        elif value.dtype.kind in 'biuf' and dtype.kind == 'f':
+            limits = numpy.finfo(dtype)
+            check = value[numpy.isfinite(value)]
+        else:
+            return value.tolist()
+        if check.size > 0 and (check.min() < limits.min or
+                               check.max() > limits.max):
+            errmsg = "Array values out of range for PV of type '%s'"
+            raise ChannelAccessException(fcn_name,
+                                         errmsg % dbr.Name(ftype).lower())
+    return numpy.ascontiguousarray(value.astype(dtype, copy=False)).ravel()
+
+def _put_data(ftype, count, value, fcn_name='put'):
+    """convert a value to data to pass to ca_array_put() and related
+    functions: this is either a newly filled data buffer, or (for numpy
+    arrays and bytes that already match the type and count) a pointer
+    to the value's own data.
+
+    Array data given as a numpy array or any object supporting the
+    buffer protocol (and bytes or bytearray for CHAR waveforms) is copied
+    with a single memmove, without converting each element to a Python
+    object.  Numpy data that cannot be cast safely to the Channel's type
+    is range-checked first: values that do not fit raise an exception
+    instead of wrapping around or overflowing.
+    """
+    ctype = dbr.Map[ftype]
+    if ftype == dbr.STRING:
+        data = (count*ctype)()
+        if count == 1:
+            data[0].value = value
+        else:
+            for elem in range(min(count, len(value))):
+                data[elem].value = value[elem]
+        return data
+    elif count == 1:
+        data = (count*ctype)()
+        try:
+            data[0] = value
+        except TypeError:
+            data[0] = type(data[0])(value)
+        except:
+            errmsg = "Cannot put value '%s' to PV of type '%s'"
+            tname  = dbr.Name(ftype).lower()
+            raise ChannelAccessException(fcn_name, \
+                                         errmsg % (repr(value),tname))
+        return data
+
+    # auto-convert strings to bytes for character waveforms
+    if ftype == dbr.CHAR and isinstance(value, str):
+        try:
+            value = STR2BYTES(value)
+        except UnicodeEncodeError:
+            errmsg = "Cannot encode string '%s' for PV of type 'char'"
+            raise ChannelAccessException(fcn_name, errmsg % value)
+    nbytes = count*ctypes.sizeof(ctype)
+    is_bytes = isinstance(value, (bytes, bytearray))
+    if is_bytes and ftype == dbr.CHAR:
+        # raw bytes: pass directly if the size matches, else copy
+        # into a zeroed buffer (null-padding character waveforms)
+        if isinstance(value, bytearray):
+            value = (ctypes.c_char*len(value)).from_buffer(value)
+        if len(value) == nbytes:
+            return value
+        data = (count*ctype)()
+        ctypes.memmove(data, value, min(len(value), nbytes))
+        return data
+
+    # bytes for other types are converted element by element below
+    if HAS_NUMPY and not is_bytes and not isinstance(value, numpy.ndarray):
+        try:
+            memoryview(value)
+            value = numpy.asarray(value)
+        except TypeError:
+            pass
+    if HAS_NUMPY and isinstance(value, numpy.ndarray):
+        value = _cast_array(value, ftype, fcn_name)
+    if HAS_NUMPY and isinstance(value, numpy.ndarray):
+        if value.size == count:
+            return value.ctypes.data_as(ctypes.c_void_p)
+        data = (count*ctype)()
+        ctypes.memmove(data, value.ctypes.data,
+                       min(value.size, count)*value.itemsize)
+        return data
+
+    data = (count*ctype)()
+    try:
+        ndata, nuser = len(data), len(value)
+        if nuser > ndata:
+            value = value[:ndata]
+        data[:len(value)] = list(value)
+    except (ValueError, IndexError, TypeError):
+        errmsg = "Cannot put array data to PV of type '%s'"
+        raise ChannelAccessException(fcn_name, errmsg % (repr(value)))
+    return data
+
 @withConnectedCHID
 def put(chid, value, wait=False, timeout=30, callback=None,
         callback_data=None):
@@ -884,65 +1834,128 @@ def put(chid, value, wait=False, timeout=30, callback=None,
     
     returns 1 on sucess and -1 on timed-out
     """
-    ftype = field_type(chid)
-    count = element_count(chid)
-    data  = (count*dbr.Map[ftype])()    
-
-    if ftype == dbr.STRING:
-        if count == 1:
-            data[0].value = value
-        else:
-            for elem in range(min(count, len(value))):
-                data[elem].value = value[elem]
-    elif count == 1:
-        try:
-            data[0] = value
-        except TypeError:
-            data[0] = type(data[0])(value)
-        except:
-            errmsg = "Cannot put value '%s' to PV of type '%s'"
-            tname  = dbr.Name(ftype).lower()
-            raise ChannelAccessException('put', \
-                                         errmsg % (repr(value),tname))
-    else:
-        # auto-convert strings to arrays for character waveforms
-        # could consider using
-        # numpy.fromstring(("%s%s" % (s,'\x00'*maxlen))[:maxlen],
-        #                  dtype=numpy.uint8)
-        if ftype == dbr.CHAR and isinstance(value, str):
-            pad = '\x00'*(1+count-len(value))
-            value = [ord(i) for i in ("%s%s" % (value, pad))[:count]]
-        try:
-            ndata, nuser = len(data), len(value)
-            if nuser > ndata:
-                value = value[:ndata]
-            data[:len(value)] = list(value)
-        except (ValueError, IndexError):
-            errmsg = "Cannot put array data to PV of type '%s'"            
-            raise ChannelAccessException('put', errmsg % (repr(value)))
-      
     # simple put, without wait or callback
     if not (wait or hasattr(callback, '__call__')):
+        ftype = field_type(chid)
+        count = element_count(chid)
+        data  = _put_data(ftype, count, value, fcn_name='put')
         ret =  libca.ca_array_put(ftype, count, chid, data)
         PySEVCHK('put', ret)
         poll()
         return ret
-    # wait with wait or callback    # wait with wait or callback
-    pvname = name(chid)
-    _put_done[pvname] = (False, callback, callback_data)
-    ret = libca.ca_array_put_callback(ftype, count, chid,
-                                      data, _CB_PUTWAIT, 0)
+    # put with wait or callback
+    request = put_request(chid, value, callback=callback,
+                          callback_data=callback_data)
+    return _finish_put(request, wait, timeout)
+
+@withConnectedCHID
+def put_request(chid, value, callback=None, callback_data=None):
+    """put value to a Channel with a completion callback, without
+    waiting.  Returns a PutRequest, which can be used to wait for this
+    put, or passed to wait_all() with other PutRequests.  Any number of
+    put requests can be pending, including many to the same Channel.
+    callback and callback_data are as for put().
+
+    The put is sent with the next flush_io(), poll(), or wait, so that
+    many put requests can go out together."""
+    request, ret = _put_request(chid, value, callback=callback,
+                                callback_data=callback_data)
     PySEVCHK('put', ret)
-    poll(evt=1.e-4, iot=0.05)
+    return request
+
+def _put_request(chid, value, callback=None, callback_data=None):
+    "start a put with completion callback, returning (request, status)"
+    ftype = field_type(chid)
+    count = element_count(chid)
+    data  = _put_data(ftype, count, value, fcn_name='put')
+    request = PutRequest(name(chid), chid, callback=callback,
+                         callback_data=callback_data)
+    _put_done[id(request)] = request
+    ret = libca.ca_array_put_callback(ftype, count, chid, data,
+                                      _CB_PUTWAIT, ctypes.py_object(request))
+    if ret != dbr.ECA_NORMAL:
+        _put_done.pop(id(request), None)
+    return request, ret
+
+def _finish_put(request, wait, timeout):
+    """wait for a put request if wait is True, returning 1 on
+    success and -1 on timed-out, as for put()"""
+    if not wait:
+        poll(evt=1.e-4, iot=0.05)
+    elif not request.wait(timeout):
+        return -dbr.ECA_NORMAL
+    return dbr.ECA_NORMAL
+
+@withCA
+def put_many(chids, values, wait=False, timeout=30.0):
+    """put values to a list of Channels, sending all of them with a
+    single flush_io(), rather than polling after each put.  With
+    wait=True, completion callbacks are used, and all puts are waited
+    for together (up to timeout).
+
+    Returns a list of status codes in the order of the input chids:
+    dbr.ECA_NORMAL on success, dbr.ECA_DISCONN for Channels that are
+    not connected, dbr.ECA_BADTYPE for values that cannot be converted
+    for the Channel, dbr.ECA_TIMEOUT for puts that did not complete
+    within timeout, or the CA status code for puts that failed.
+    """
+    out, requests = [], []
+    for chid, value in zip(chids, values):
+        if isinstance(chid, int):
+            chid = dbr.chid_t(chid)
+        if not isConnected(chid):
+            out.append(dbr.ECA_DISCONN)
+            continue
+        try:
+            if wait:
+                request, ret = _put_request(chid, value)
+                if ret == dbr.ECA_NORMAL:
+                    requests.append((len(out), request))
+            else:
+                ftype = field_type(chid)
+                count = element_count(chid)
+                data  = _put_data(ftype, count, value, fcn_name='put_many')
+                ret = libca.ca_array_put(ftype, count, chid, data)
+        except (ChannelAccessException, TypeError, ValueError):
+            ret = dbr.ECA_BADTYPE
+        out.append(ret)
+    flush_io()
     if wait:
-        start_time, finished = time.time(), False
-        while not finished:
-            poll()
-            finished = (_put_done[pvname][0] or
-                        (time.time()-start_time) > timeout)
-        if not _put_done[pvname][0]:
-            ret = -ret
-    return ret
+        wait_all([request for i, request in requests], timeout=timeout)
+        for i, request in requests:
+            if not request.done:
+                out[i] = dbr.ECA_TIMEOUT
+            elif request.status != dbr.ECA_NORMAL:
+                out[i] = request.status
+    return out
+
+def wait_all(requests, timeout=30.0):
+    """wait up to timeout for all PutRequests to complete.
+    returns True if all have completed, False if timed-out."""
+    start_time = time.time()
+    for request in requests:
+        remaining = max(0.0, timeout - (time.time() - start_time))
+        if not request.wait(remaining):
+            return False
+    return True
+
+## CTRL fields of Channels for get_ctrlvars() with CTRLVARS_CACHE:
+#  chid.value: _CtrlVars
+_ctrlvars = {}
+
+class _CtrlVars(_EventContext):
+    """context for a subscription for property and alarm changes of a
+    Channel, keeping its CTRL fields for get_ctrlvars()"""
+    __slots__ = ('fields', 'monref')
+
+    def __init__(self, chid, ftype):
+        _EventContext.__init__(self, None, chid, ftype)
+        self.fields = None
+        self.monref = None
+
+    def __call__(self, args):
+        "update CTRL fields from an event"
+        self.fields = _ctrl_fields(self.dtype.from_address(args.raw_dbr))
 
 @withConnectedCHID
 def get_ctrlvars(chid):
@@ -956,16 +1969,50 @@ def get_ctrlvars(chid):
         
     note (difference with C lib): enum_strs will be a
     list of strings for the names of ENUM states.
-    
+
+    With CTRLVARS_CACHE, the first call for a Channel reads the fields
+    from the server and makes a subscription for property and alarm
+    changes, and later calls return the fields kept by the subscription.
     """
+    if not CTRLVARS_CACHE:
+        return _get_ctrlvars(chid)
+    with _subscriptions_lock:
+        entry = _ctrlvars.get(chid.value, None)
+        create = entry is None
+        if create:
+            ftype = promote_type(chid, use_ctrl=True)
+            entry = _ctrlvars[chid.value] = _CtrlVars(chid, ftype)
+    if create:
+        # never wait for the first event: this may be run in a CA callback
+        try:
+            entry.monref = _create_subscription(chid, entry.ftype,
+                                                dbr.DBE_PROPERTY|dbr.DBE_ALARM,
+                                                1, entry)
+        except ChannelAccessException:
+            with _subscriptions_lock:
+                _ctrlvars.pop(chid.value, None)
+            raise
+    fields = entry.fields
+    if fields is None:
+        fields = _get_ctrlvars(chid)
+        with _subscriptions_lock:
+            if entry.fields is None:
+                entry.fields = fields
+    return dict(fields)
+
+def _get_ctrlvars(chid):
+    "get the CTRL fields for a Channel from the server"
     ftype = promote_type(chid, use_ctrl=True)
     dat = (1*dbr.Map[ftype])()
 
     ret = libca.ca_array_get(ftype, 1, chid, dat)
     PySEVCHK('get_ctrlvars', ret)
     poll()
+    return _ctrl_fields(dat[0])
+
+def _ctrl_fields(tmpv):
+    "return dictionary of the CTRL fields of a DBR value"
     out = {}
-    tmpv = dat[0]
     for attr in ('precision', 'units', 'severity', 'status',
                  'upper_disp_limit', 'lower_disp_limit',
                  'upper_alarm_limit', 'upper_warning_limit',
@@ -1033,10 +2080,18 @@ def create_subscription(chid, use_time=False, use_ctrl=False,
     """
     ftype = promote_type(chid, use_ctrl=use_ctrl, use_time=use_time)
 
-    uarg  = ctypes.py_object(callback)
+    if not hasattr(callback, '__call__'):
+        callback = None
+    return _create_subscription(chid, ftype, mask, 0,
+                                _EventContext(callback, chid, ftype))
+
+def _create_subscription(chid, ftype, mask, count, context):
+    """create a subscription with an _EventContext, returning
+    (callback, user argument, event id)"""
+    uarg  = ctypes.py_object(context)
     evid  = ctypes.c_void_p()
     poll()
-    ret = libca.ca_create_subscription(ftype, 0, chid, mask,
+    ret = libca.ca_create_subscription(ftype, count, chid, mask,
                                        _CB_EVENT, uarg, ctypes.byref(evid))
     PySEVCHK('create_subscription', ret)
     
@@ -1049,6 +2104,193 @@ def clear_subscription(evid):
     "cancel subscription"
     return libca.ca_clear_subscription(evid)
 
+## Subscriptions shared by subscribe():
+#  (chid, ftype, mask, count): _SharedSubscription
+_subscriptions = {}
+_subscriptions_lock = threading.RLock()
+
+class _SharedSubscription(object):
+    """one CA subscription, with the callbacks of all of its users.
+    Each event is unpacked once, and passed to every callback, with
+    array values copied for each callback after the first."""
+    __slots__ = ('key', 'callbacks', 'monref', 'last')
+
+    def __init__(self, key):
+        self.key = key
+        self.callbacks = ()
+        self.monref = None
+        self.last = None
+
+    def __call__(self, **kwds):
+        "run all callbacks for an event"
+        with _subscriptions_lock:
+            self.last = kwds
+            callbacks = self.callbacks
+        # copies are made before any callback can change the value
+        value = kwds.get('value', None)
+        values = [value] + [_copy_value(value) for i in callbacks[1:]]
+        error = None
+        for callback, value in zip(callbacks, values):
+            kwds = dict(kwds, value=value)
+            # an error in one callback must not stop the others:
+            # the first one is raised when all callbacks have run.
+            try:
+                callback(**kwds)
+            except Exception:
+                if error is None:
+                    error = sys.exc_info()[1]
+        if error is not None:
+            raise error
+
+def _copy_value(value):
+    "copy of a mutable value (list or array) from an event"
+    if isinstance(value, list):
+        return list(value)
+    if hasattr(value, 'copy'):
+        return value.copy()
+    return value
+
+@withConnectedCHID
+def subscribe(chid, callback, use_time=False, use_ctrl=False, mask=7,
+              count=0):
+    """add a callback for changes to a Channel, as for create_subscription(),
+    sharing one CA subscription between all callers with the same chid,
+    DBR type, mask, and count (0 for the native count).  Each event is
+    unpacked once, and passed to all of their callbacks.
+
+    If the subscription already exists, the callback is run at once with
+    the latest event.  returns a handle to pass to unsubscribe().
+
+    Each callback gets its own copy of array values, as with separate
+    subscriptions.  Errors raised by a callback do not stop the others.
+    """
+    ftype = promote_type(chid, use_ctrl=use_ctrl, use_time=use_time)
+    key = (chid.value, ftype, mask, count)
+    with _subscriptions_lock:
+        sub = _subscriptions.get(key, None)
+        create = sub is None
+        if create:
+            sub = _subscriptions[key] = _SharedSubscription(key)
+        sub.callbacks = sub.callbacks + (callback,)
+        last = sub.last
+    if create:
+        try:
+            sub.monref = _create_subscription(chid, ftype, mask, count,
+                                              _EventContext(sub, chid, ftype))
+        except ChannelAccessException:
+            with _subscriptions_lock:
+                _subscriptions.pop(key, None)
+            raise
+    elif last is not None:
+        callback(**dict(last, value=_copy_value(last.get('value', None))))
+    return (key, callback)
+
+def unsubscribe(handle):
+    """remove a callback added with subscribe(), clearing the
+    CA subscription when its last callback is removed"""
+    key, callback = handle
+    monref = None
+    with _subscriptions_lock:
+        sub = _subscriptions.get(key, None)
+        if sub is None or callback not in sub.callbacks:
+            return
+        callbacks = list(sub.callbacks)
+        callbacks.remove(callback)
+        sub.callbacks = tuple(callbacks)
+        if len(callbacks) == 0:
+            _subscriptions.pop(key, None)
+            monref, sub.last = sub.monref, None
+    if monref is not None:
+        clear_subscription(monref[2])
+
+def subscription_info():
+    """return dictionary of the number of CA subscriptions made by
+    subscribe() ('subscriptions') and of their callbacks ('callbacks')"""
+    with _subscriptions_lock:
+        return {'subscriptions': len(_subscriptions),
+                'callbacks': sum([len(sub.callbacks) for sub in
+                                  _subscriptions.values()])}
+
+## BatchSubscriptions not yet cleared, kept alive while libca may
+## still call back into their _BatchContext
+_batch_subscriptions = set()
+
+class BatchSubscription(object):
+    """subscription to changes of a scalar Channel, delivering events
+    in batches, for Channels that change faster than a callback can be
+    run for each change:
+
+    >>> def onbatch(pvname=None, events=None, **kws):
+    ...     print(pvname, len(events), events['value'].mean())
+    >>> sub = ca.BatchSubscription(chid, onbatch, batch_size=1000,
+    ...                            window=0.5)
+
+    Each event is added to a numpy structured array with fields value,
+    severity, status, and timestamp, and the callback is run with the
+    events as callback(pvname=pvname, chid=chid, events=events) when
+    batch_size events have arrived, or, if window is not None, window
+    seconds after the first event in the batch, from a thread shared by
+    all BatchSubscriptions.  flush() runs the callback with the events
+    waiting in the batch.  The subscription stays active, even with no
+    reference to it left, until clear() is called or the Channel is
+    cleared.
+    """
+    def __init__(self, chid, callback, batch_size=1000, window=None,
+                 mask=7):
+        if not HAS_NUMPY:
+            raise ChannelAccessException('BatchSubscription',
+                                         'numpy is required')
+        if not isinstance(chid, dbr.chid_t):
+            chid = dbr.chid_t(chid)
+        if not connect_channel(chid):
+            raise ChannelAccessException('BatchSubscription',
+                                         'channel not connected')
+        if element_count(chid) != 1:
+            raise ChannelAccessException('BatchSubscription',
+                                         'only for scalar Channels')
+        ftype = promote_type(chid, use_time=True)
+        self._context = _BatchContext(callback, chid, ftype,
+                                      batch_size, window)
+        self._monref = _create_subscription(chid, ftype, mask, 1,
+                                            self._context)
+        with _subscriptions_lock:
+            _batch_subscriptions.add(self)
+
+    def flush(self):
+        "run the callback with the events waiting in the batch, if any"
+        self._context.flush()
+
+    def clear(self):
+        "flush the batch and clear the subscription"
+        if self._monref is not None:
+            monref, self._monref = self._monref, None
+            clear_subscription(monref[2])
+            with _subscriptions_lock:
+                _batch_subscriptions.discard(self)
+            self.flush()
+
+def _drop_subscriptions(chids):
+    """forget shared subscriptions and cached CTRL fields of Channels
+    that are being cleared.  The objects removed are returned: libca
+    may call back into them until the Channels have been cleared, so
+    the caller must hold on to them until then."""
+    values = set(chid.value for chid in chids)
+    dropped = []
+    with _subscriptions_lock:
+        for key in list(_subscriptions.keys()):
+            if key[0] in values:
+                dropped.append(_subscriptions.pop(key))
+        for value in values:
+            if value in _ctrlvars:
+                dropped.append(_ctrlvars.pop(value))
+        for sub in list(_batch_subscriptions):
+            if sub._context.chid.value in values:
+                # the subscription is cleared with the Channel
+                _batch_subscriptions.discard(sub)
+                sub._monref = None
+                dropped.append(sub)
+    return dropped
+
 
 @withCA
 @withSEVCHK
@@ -1083,12 +2325,14 @@ def sg_reset(gid):
     "sg reset"
     return libca.ca_sg_reset(gid)
 
-def sg_get(gid, chid, ftype=None, as_numpy=True, as_string=True):
+def sg_get(gid, chid, ftype=None, as_numpy=None, as_string=None):
     """synchronous-group get of the current value for a Channel.
-    same options as get()
-    
-    Note that the returned tuple from a sg_get() will have to be
-    unpacked with the '_unpack' method:
+
+    This returns the data buffer that will be filled by sg_block(), which
+    will have to be unpacked with the '_unpack' method.  Earlier versions
+    returned a value unpacked before sg_block() had run; as_numpy and
+    as_string applied only to that value, and now give a warning and are
+    otherwise ignored.  See SyncGroup for a simpler interface:
 
     >>> chid = epics.ca.create_channel(PV_Name)
     >>> epics.ca.connect_channel(chid1)
@@ -1099,6 +2343,10 @@ def sg_get(gid, chid, ftype=None, as_numpy=True, as_string=True):
     """
     if not isinstance(chid, dbr.chid_t):
         raise ChannelAccessException('sg_get', "not a valid chid!")
+    if as_numpy is not None or as_string is not None:
+        warnings.warn("sg_get() returns a data buffer to unpack with "
+                      "_unpack() after sg_block(): as_numpy and as_string "
+                      "are ignored", stacklevel=2)
 
     if ftype is None:
         ftype = field_type(chid)
@@ -1107,12 +2355,7 @@ def sg_get(gid, chid, ftype=None, as_numpy=True, as_string=True):
     data = (count*dbr.Map[ftype])()
     ret = libca.ca_sg_array_get(gid, ftype, count, chid, data)
     PySEVCHK('sg_get', ret)
-    poll()
-
-    val = _unpack(data, count=count, ftype=ftype, as_numpy=as_numpy)
-    if as_string:
-        val = _as_string(val, chid, count, ftype)
-    return val
+    return data
  
 def sg_put(gid, chid, value):
     "synchronous-group put: cannot wait or get callback!"
@@ -1121,43 +2364,112 @@ def sg_put(gid, chid, value):
 
     ftype = field_type(chid)
     count = element_count(chid)
-    data  = (count*dbr.Map[ftype])()    
+    data  = _put_data(ftype, count, value, fcn_name='sg_put')
 
-    if ftype == dbr.STRING:
-        if count == 1:
-            data[0].value = value
-        else:
-            for elem in range(min(count, len(value))):
-                data[elem].value = value[elem]
-    elif count == 1:
-        try:
-            data[0] = value
-        except TypeError:
-            data[0] = type(data[0])(value)
-        except:
-            errmsg = "Cannot put value '%s' to PV of type '%s'"
-            tname   = dbr.Name(ftype).lower()
-            raise ChannelAccessException('put', \
-                                         errmsg % (repr(value),tname))
-    else:
-        # auto-convert strings to arrays for character waveforms
-        # could consider using
-        # numpy.fromstring(("%s%s" % (s,'\x00'*maxlen))[:maxlen],
-        #                  dtype=numpy.uint8)
-        if ftype == dbr.CHAR and isinstance(value, str):
-            pad = '\x00'*(1+count-len(value))
-            value = [ord(i) for i in ("%s%s" % (value, pad))[:count]]
-        try:
-            ndata = len(data)
-            nuser = len(value)
-            if nuser > ndata:
-                value = value[:ndata]
-            data[:len(value)] = list(value)
-        except:
-            errmsg = "Cannot put array data to PV of type '%s'"            
-            raise ChannelAccessException('put', errmsg % (repr(value)))
-      
     ret =  libca.ca_sg_array_put(gid, ftype, count, chid, data)
     PySEVCHK('sg_put', ret)
     # poll()
     return ret
+
+class SyncGroup(object):
+    """synchronous group of gets and puts for a set of Channels, sent
+    together and completed with a single sg_block():
+
+    >>> sg = ca.SyncGroup(chids)
+    >>> values = sg.get()      # consistent snapshot of all Channels
+    >>> sg.put(values)         # put a value to each Channel
+
+    Gets and puts to any Channels can also be queued with add_get()
+    and add_put(), and then all done with block(), which returns the
+    values of the queued gets.  Data buffers for gets are kept and
+    reused by later cycles with the same types and counts.
+    """
+    def __init__(self, chids=(), as_numpy=True, as_string=False,
+                 timeout=10.0):
+        self.gid = sg_create()
+        self.timeout = timeout
+        self.chids = []
+        self._getargs = []
+        self._gets = []
+        self._puts = []
+        self._buffers = []
+        for chid in chids:
+            self.add_channel(chid, as_numpy=as_numpy, as_string=as_string)
+
+    def add_channel(self, chid, as_numpy=True, as_string=False):
+        "add a Channel to the Channels used by get() and put()"
+        if not isinstance(chid, dbr.chid_t):
+            chid = dbr.chid_t(chid)
+        connect_channel(chid)
+        self.chids.append(chid)
+        self._getargs.append((chid, field_type(chid), element_count(chid),
+                              as_numpy, as_string))
+
+    def add_get(self, chid, ftype=None, count=None, as_numpy=True,
+                as_string=False):
+        "queue a get for a Channel, to be done by the next block()"
+        if ftype is None:
+            ftype = field_type(chid)
+        if count is None:
+            count = element_count(chid)
+        self._queue_get(chid, ftype, count, as_numpy, as_string)
+
+    def add_put(self, chid, value):
+        "queue a put of value to a Channel, to be done by the next block()"
+        ftype = field_type(chid)
+        count = element_count(chid)
+        data = _put_data(ftype, count, value, fcn_name='sg_put')
+        ret = libca.ca_sg_array_put(self.gid, ftype, count, chid, data)
+        PySEVCHK('sg_put', ret)
+        # keep the data until the group is done
+        self._puts.append(data)
+
+    def block(self, timeout=None):
+        """send all queued gets and puts, wait for them to complete,
+        and return a list of values for the queued gets"""
+        if timeout is None:
+            timeout = self.timeout
+        gets, self._gets, self._puts = self._gets, [], []
+        try:
+            sg_block(self.gid, timeout)
+        finally:
+            sg_reset(self.gid)
+        out = []
+        for chid, ftype, count, data, as_numpy, as_string in gets:
+            val = _unpack(data, count=count, ftype=ftype, as_numpy=as_numpy)
+            if as_string:
+                val = _as_string(val, chid, count, ftype)
+            out.append(val)
+        return out
+
+    def get(self, timeout=None):
+        "return a list of values for all Channels, read together"
+        for args in self._getargs:
+            self._queue_get(*args)
+        return self.block(timeout=timeout)
+
+    def put(self, values, timeout=None):
+        "put a list of values, one for each Channel, together"
+        for chid, value in zip(self.chids, values):
+            self.add_put(chid, value)
+        self.block(timeout=timeout)
+
+    def close(self):
+        "delete the synchronous group"
+        if self.gid is not None:
+            sg_delete(self.gid)
+            self.gid = None
+
+    def _queue_get(self, chid, ftype, count, as_numpy, as_string):
+        "queue a get into a reused buffer"
+        index = len(self._gets)
+        if index < len(self._buffers):
+            data = self._buffers[index]
+            if len(data) != count or data._type_ is not dbr.Map[ftype]:
+                data = self._buffers[index] = (count*dbr.Map[ftype])()
+        else:
+            data = (count*dbr.Map[ftype])()
+            self._buffers.append(data)
+        ret = libca.ca_sg_array_get(self.gid, ftype, count, chid, data)
+        PySEVCHK('sg_get', ret)
+        self._gets.append((chid, ftype, count, data, as_numpy, as_string))
@@ -15,6 +15,8 @@ import time
 # EPICS Constants
 ECA_NORMAL = 1
 ECA_TIMEOUT = 80
+ECA_BADTYPE = 114
+ECA_DISCONN = 192
 ECA_IODONE = 339
 ECA_ISATTACHED = 424
 
@@ -23,6 +25,12 @@ OP_CONN_UP = 6
 OP_CONN_DOWN = 7
 
 CS_NEVER_SEARCH = 4
+
+# event masks for subscriptions
+DBE_VALUE    = 1
+DBE_LOG      = 2
+DBE_ALARM    = 4
+DBE_PROPERTY = 8
 #
 # Note that DBR_XXX should be replaced with dbr.XXX
 # 
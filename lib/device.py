@@ -135,6 +135,20 @@ class Device(object):
         self._pvs[attr] = pv.PV(pvname, **kw)
         return self._pvs[attr]
     
+    def wait_for_connection(self, timeout=None):
+        """wait (up to timeout) for the PVs of all current attributes
+        to connect, with a single deadline for all of them rather than
+        a timeout for each.  Returns whether all PVs are connected."""
+        if timeout is None:
+            timeout = ca.DEFAULT_CONNECTION_TIMEOUT
+        ca.flush_io()
+        start_time = time.time()
+        for thispv in self._pvs.values():
+            if not thispv.connected:
+                remaining = max(0, timeout - (time.time()-start_time))
+                ca._wait_event(thispv._conn_event, remaining)
+        return all(thispv.connected for thispv in self._pvs.values())
+
     def put(self, attr, value, wait=False, timeout=10.0):
         """put an attribute value, 
         optionally wait for completion or
@@ -148,15 +162,20 @@ class Device(object):
         option as_string returns a string representation"""
         return self.PV(attr).get(as_string=as_string)
     
-    def save_state(self):
+    def save_state(self, timeout=None):
         """return a dictionary of the values of all
-        current attributes"""
+        current attributes.  All PVs are connected and read
+        together (see pv.get_pvs), and character waveforms
+        are returned as strings."""
+        self.wait_for_connection(timeout=timeout)
+        keys = list(self._pvs.keys())
+        pvs = [self._pvs[key] for key in keys]
         out = {}
-        for key in self._pvs:
-            out[key] = self._pvs[key].get()
-            if  (self._pvs[key].count > 1 and
-                 'char' == self._pvs[key].type):
-                out[key] = self._pvs[key].get(as_string=True)
+        for key, thispv, val in zip(keys, pvs, pv.get_pvs(pvs)):
+            if (val is not None and thispv.count > 1 and
+                'char' == thispv.type):
+                val = thispv._set_charval(val, call_ca=False)
+            out[key] = val
         return out
 
     def restore_state(self, state):
@@ -209,10 +228,10 @@ class Device(object):
         return state
 
 
-    def get_all(self):
+    def get_all(self, timeout=None):
         """return a dictionary of the values of all
         current attributes"""
-        return self.save_state()
+        return self.save_state(timeout=timeout)
 
     def add_callback(self, attr, callback, **kws):
         """add a callback function to an attribute PV,
@@ -0,0 +1,156 @@
+#!/usr/bin/python
+#  M Newville <newville@cars.uchicago.edu>
+#  The University of Chicago, 2010
+#  Epics Open License
+"""
+Dispatching of PV callbacks to a pool of worker threads
+
+By default, user callbacks for a PV run inside the CA callback that
+delivered the event, so that one slow callback delays events for all
+channels.  With a Dispatcher, a PV puts each event on a bounded queue
+for that PV and returns at once, and a pool of worker threads runs the
+callbacks:
+
+  >>> from epics import pv, dispatch
+  >>> pv.CALLBACK_DISPATCHER = dispatch.Dispatcher(workers=4, maxsize=100)
+
+PVs created after this will use the dispatcher.  Events for one PV are
+always run in order, and by only one worker at a time.  When the queue
+for a PV is full, the oldest event is dropped.
+"""
+import threading
+import traceback
+from collections import deque
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from . import ca
+
+class _KeyQueue(object):
+    "queue of pending calls and statistics for one key"
+    __slots__ = ('calls', 'active', 'max_depth', 'dropped',
+                 'processed', 'errors')
+
+    def __init__(self):
+        self.calls = deque()
+        self.active = False
+        self.max_depth = 0
+        self.dropped = 0
+        self.processed = 0
+        self.errors = 0
+
+class Dispatcher(object):
+    """run callbacks in a pool of worker threads, with a bounded queue
+    of pending calls for each key (a PV name, for PVs).
+
+       workers   number of worker threads
+       maxsize   maximum number of pending calls for each key,
+                 0 for no limit.
+
+    The worker threads are started with the first call to submit(),
+    and attach to the CA context of the thread that made that call.
+    """
+    def __init__(self, workers=4, maxsize=100):
+        self.workers = workers
+        self.maxsize = maxsize
+        self._queues = {}
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, key, fcn, *args):
+        """queue fcn(*args) to be run after all pending calls for key.
+        returns False if an older call for key had to be dropped."""
+        if not self._threads:
+            self._start()
+        with self._lock:
+            kq = self._queues.get(key, None)
+            if kq is None:
+                kq = self._queues[key] = _KeyQueue()
+            dropped = self.maxsize > 0 and len(kq.calls) >= self.maxsize
+            if dropped:
+                kq.calls.popleft()
+                kq.dropped += 1
+            kq.calls.append((fcn, args))
+            kq.max_depth = max(kq.max_depth, len(kq.calls))
+            schedule = not kq.active
+            kq.active = True
+        if schedule:
+            self._ready.put(key)
+        return not dropped
+
+    def depth(self, key):
+        "number of pending calls for key"
+        kq = self._queues.get(key, None)
+        if kq is None:
+            return 0
+        return len(kq.calls)
+
+    def stats(self):
+        """return dictionary of statistics: the totals of 'depth' (calls
+        now pending), 'dropped', 'processed', and 'errors' (calls that
+        raised an exception), and 'keys', a dictionary with these and
+        'max_depth' for each key."""
+        out = {'workers': len(self._threads), 'depth': 0, 'dropped': 0,
+               'processed': 0, 'errors': 0, 'keys': {}}
+        with self._lock:
+            for key, kq in self._queues.items():
+                kstats = {'depth': len(kq.calls), 'max_depth': kq.max_depth,
+                          'dropped': kq.dropped, 'processed': kq.processed,
+                          'errors': kq.errors}
+                for name in ('depth', 'dropped', 'processed', 'errors'):
+                    out[name] += kstats[name]
+                out['keys'][key] = kstats
+        return out
+
+    def stop(self, timeout=None):
+        """stop the worker threads.  The workers will be started again
+        by the next submit(), and will then run any calls still pending."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            self._ready.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def _start(self):
+        "start the worker threads"
+        context = ca.current_context()
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, args=(context,),
+                                          name='epics-dispatch-%i' % i)
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self, context):
+        "worker thread: run pending calls for ready keys"
+        if context is not None:
+            ca.attach_context(context)
+        while True:
+            key = self._ready.get()
+            if key is None:
+                return
+            with self._lock:
+                kq = self._queues[key]
+                fcn, args = kq.calls.popleft()
+            error = False
+            try:
+                fcn(*args)
+            except Exception:
+                error = True
+                traceback.print_exc()
+            with self._lock:
+                kq.processed += 1
+                kq.errors += error
+                kq.active = len(kq.calls) > 0
+                schedule = kq.active
+            # a key is only ever on the ready queue once, so that
+            # the calls for each key are run in order.
+            if schedule:
+                self._ready.put(key)
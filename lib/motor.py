@@ -574,6 +574,76 @@ class Motor(device.Device):
             
         ca.write("\n".join(out))
 
+def move_many(targets, wait=True, timeout=300.0, dial=False, raw=False,
+              ignore_limits=False):
+    """ moves several motors at once, so that the total time is that of
+    the slowest motor, rather than the sum of all moves.
+
+    arguments:
+     targets        dictionary of {motor: value to move to}, with
+                    motor either a Motor or a motor name
+     wait           whether to wait for all moves to complete (T/F) [T]
+     dial           use dial coordinates                 (T/F) [F]
+     raw            use raw coordinates                  (T/F) [F]
+     ignore_limits  try moves without regard to limits   (T/F) [F]
+     timeout        max time for all moves to complete (in seconds) [300]
+    returns:
+      None : unable to move, invalid value given or a motor
+             not connected -- no move attempted
+      -1   : a target value outside limits -- no move attempted,
+             or a motor limit was reached
+      -2   : with wait=True, wait time exceeded timeout
+      -3   : a motor disconnected after other moves were started:
+             those moves are still waited for (with wait=True)
+      0    : moves executed successfully
+
+    All targets are checked against the motor limits, and all drive
+    PVs for connection, before any motor is moved.  The drive values
+    are then all put with completion callbacks, and waited on together:
+    a put to a motor drive field completes when that motor is done moving.
+    """
+    drv, lims = ('VAL', 'user')
+    if dial:
+        drv, lims = ('DVAL', 'dial')
+    if raw:
+        drv, lims = ('RVAL', None)
+
+    moves = []
+    for motor, val in targets.items():
+        if not isinstance(motor, Motor):
+            motor = Motor(motor)
+        try:
+            val = float(val)
+        except (TypeError, ValueError):
+            return None
+        if (lims is not None and not ignore_limits and
+            not motor.within_limits(val, dial=dial)):
+            return -1
+        moves.append((motor.PV(drv), motor, val))
+
+    for drvpv, motor, val in moves:
+        if not drvpv.wait_for_connection():
+            return None
+    requests = [drvpv.put_request(val) for drvpv, motor, val in moves]
+    # a motor may have disconnected since it was checked, after
+    # the moves before it were started
+    ret = 0
+    if None in requests:
+        requests = [req for req in requests if req is not None]
+        ret = -3
+    if not wait:
+        ca.flush_io()
+        return ret
+    if not ca.wait_all(requests, timeout=timeout) and ret == 0:
+        ret = -2
+    for drvpv, motor, val in moves:
+        try:
+            motor.check_limits()
+        except MotorLimitException:
+            if ret != -3:
+                ret = -1
+    return ret
+
 if (__name__ == '__main__'):
     for arg in sys.argv[1:]:
         m = Motor(arg)
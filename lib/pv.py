@@ -8,11 +8,17 @@
 """
 import time
 import copy
+import threading
+import weakref
 from math import log10
 
 from . import ca
 from . import dbr
 
+## A dispatch.Dispatcher to run user callbacks for PVs created from
+## now on in worker threads, or None to run them in the CA callback.
+CALLBACK_DISPATCHER = None
+
 def fmt_time(tstamp=None):
     "simple formatter for time values"
     if tstamp is None:
@@ -21,6 +27,201 @@ def fmt_time(tstamp=None):
     return "%s.%6.6i" % (time.strftime("%Y-%m-%d %H:%M:%S",
                                        time.localtime(tstamp)), 1.e6*frac)
 
+def connect_pvs(pvnames, timeout=None, **kws):
+    """create and connect PVs for a list of names, waiting once for all
+    connections (see ca.connect_many) rather than once per PV.  Any
+    keyword arguments are passed on to PV().
+
+    returns a list of PVs in the same order as pvnames.  PVs that
+    did not connect within timeout are included, with connected=False.
+    """
+    conn, unconn = ca.connect_many(pvnames, timeout=timeout)
+    pvs = [PV(pvname, **kws) for pvname in pvnames]
+    # the PVs now hold the Channels
+    for chid in list(conn.values()) + list(unconn.values()):
+        ca.release_channel(chid)
+    return pvs
+
+def get_pvs(pvs, timeout=5.0):
+    """return a list of the current values for a list of PVs, in the
+    same order.  The values of monitored PVs are used as they are, and
+    all other PVs are read with a single request (see ca.get_many),
+    rather than one request per PV.  None is returned for PVs that
+    are not connected, or whose data did not arrive within timeout.
+    """
+    out = [None]*len(pvs)
+    toget = []
+    for i, thispv in enumerate(pvs):
+        if not thispv.connected:
+            continue
+        if thispv._is_current(None, None):
+            out[i] = thispv._args['value']
+        else:
+            toget.append(i)
+    if len(toget) > 0:
+        results = ca.get_many([pvs[i].chid for i in toget], timeout=timeout)
+        now = time.time()
+        for i, (val, status) in zip(toget, results):
+            if status != dbr.ECA_NORMAL:
+                continue
+            thispv = pvs[i]
+            thispv._args['value'] = out[i] = val
+            thispv._args['char_value'] = None
+            thispv.received = now
+            thispv._received_count = None
+    return out
+
+def _format_value(val, ftype, count, precision=None, enum_strs=None):
+    """ returns the character representation of a value of a Channel
+    with the given type and count: this is the char_value of a PV"""
+    ntype = ca.native_type(ftype)
+    if ntype == dbr.STRING:
+        return val
+    cval  = repr(val)
+    if count > 1:
+        if ntype == dbr.CHAR and count < ca.AUTOMONITOR_MAXLENGTH:
+            val = list(val)
+            if 0 in val:
+                firstnull  = val.index(0)
+            else:
+                firstnull = len(val)
+            try:
+                cval = ''.join([chr(i) for i in val[:firstnull]]).rstrip()
+            except ValueError:
+                pass
+        else:
+            cval = '<array size=%d, type=%s>' % (len(val),
+                                                 dbr.Name(ftype).lower())
+    elif ntype in (dbr.FLOAT, dbr.DOUBLE):
+        try:
+            fmt  = "%%.%if"
+            if 4 < abs(int(log10(abs(val + 1.e-9)))):
+                fmt = "%%.%ig"
+            cval = (fmt %  precision) % val
+        except (ValueError, TypeError, ArithmeticError):
+            return str(val)
+
+    elif ntype == dbr.ENUM:
+        try:
+            cval = enum_strs[val]
+        except (TypeError, KeyError,  IndexError):
+            pass
+    return cval
+
+class EventFilter(object):
+    """policy for coalescing monitor events, for a PV or for one callback:
+
+       max_rate          maximum rate (in Hz) of events passed on
+       deadband          minimum absolute change in value since the
+                         last event passed on
+       deadband_percent  minimum change in value, as a percentage of
+                         the last value passed on
+       latest_only       if True (default), an event dropped because of
+                         max_rate is held, and the latest held event is
+                         passed on at the end of the rate interval, so
+                         that the final value is never lost.  Later
+                         events replace a held event, even inside the
+                         deadbands.
+
+    The deadbands apply to numerical values only (for arrays, the
+    largest change of any element is used).  An EventFilter keeps the
+    state of the events it has seen, so each PV or callback needs its
+    own EventFilter.
+    """
+    def __init__(self, max_rate=None, deadband=None, deadband_percent=None,
+                 latest_only=True):
+        self.min_interval = 0
+        if max_rate:
+            self.min_interval = 1.0/max_rate
+        self.deadband = deadband
+        self.deadband_percent = deadband_percent
+        self.latest_only = latest_only
+        self.last_value = None
+        self.last_time = 0
+        self.passed = 0
+        self.dropped = 0
+        self._held = None
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def accept(self, value, deliver=None, *args):
+        """return whether an event with value should be passed on now.
+
+        If the event is dropped only because of max_rate and latest_only
+        is set, deliver(*args) will be called for the latest such event
+        at the end of the rate interval."""
+        now = time.time()
+        with self._lock:
+            if (self._held is not None and deliver is not None and
+                now < self.last_time + self.min_interval):
+                # an event is held: the latest event replaces it, even
+                # if it is inside the deadbands, so it is never lost
+                self.dropped += 1
+                self._held = (value, deliver, args)
+                return False
+            if not self._outside_deadband(value):
+                self.dropped += 1
+                return False
+            wait = self.last_time + self.min_interval - now
+            if wait > 0:
+                self.dropped += 1
+                if self.latest_only and deliver is not None:
+                    self._hold(wait, value, deliver, args)
+                return False
+            self._held = None
+            self.last_value = value
+            self.last_time = now
+            self.passed += 1
+        return True
+
+    def cancel(self):
+        "drop any held event"
+        with self._lock:
+            self._held = None
+
+    def _outside_deadband(self, value):
+        "whether value differs enough from the last value passed on"
+        last = self.last_value
+        if last is None or (self.deadband is None and
+                            self.deadband_percent is None):
+            return True
+        try:
+            delta = abs(value - last)
+            if hasattr(delta, 'max'):
+                delta = delta.max()
+            if self.deadband is not None and delta <= self.deadband:
+                return False
+            if self.deadband_percent is not None:
+                scale = abs(last)
+                if hasattr(scale, 'max'):
+                    scale = scale.max()
+                if delta <= scale * self.deadband_percent / 100.0:
+                    return False
+        except (TypeError, ValueError):
+            pass
+        return True
+
+    def _hold(self, wait, value, deliver, args):
+        "hold an event, to be passed on after wait seconds"
+        self._held = (value, deliver, args)
+        if not self._scheduled:
+            self._scheduled = True
+            ca._scheduler.call_at(time.time() + wait, ca.current_context(),
+                                  self._flush)
+
+    def _flush(self):
+        "pass on the latest held event, if any"
+        with self._lock:
+            self._scheduled = False
+            held, self._held = self._held, None
+            if held is None:
+                return
+            value, deliver, args = held
+            self.last_value = value
+            self.last_time = time.time()
+            self.passed += 1
+        deliver(*args)
+
 class PV(object):
     """Epics Process Variable
     
@@ -52,7 +253,8 @@ class PV(object):
     def __init__(self, pvname, callback=None, form='native',
                  verbose=False, auto_monitor=None,
                  connection_callback=None,
-                 connection_timeout=None):
+                 connection_timeout=None, event_filter=None,
+                 eager_char_value=False):
         self.pvname     = pvname.strip()
         self.form       = form.lower()
         self.verbose    = verbose
@@ -60,6 +262,8 @@ class PV(object):
         self.ftype      = None
         self.connected  = False
         self.connection_timeout = connection_timeout
+        self.received   = None  # local time the value was received
+        self._received_count = None
         self._args      = {}.fromkeys(self._fields)
         self._args['pvname'] = self.pvname
         self._args['count'] = -1
@@ -68,8 +272,16 @@ class PV(object):
         self._args['access'] = 'unknown'
         self.connection_callback = connection_callback
         self.callbacks  = {}
-        self._monref = None  # holder of data returned from create_subscription
+        self.event_filter = event_filter
+        self.eager_char_value = eager_char_value
+        self.dispatcher = CALLBACK_DISPATCHER
+        self._callback_filters = {}
+        self._callback_nochar = set()  # callbacks not given char_value
+        self._monref = None  # handle returned from ca.subscribe
         self._conn_started = False
+        self._conn_event = threading.Event()
+        self._released = False
+        self._put_request = None  # most recent put with wait or callback
         self.chid = None
 
         self._args['chid'] = self.chid = ca.create_channel(self.pvname,
@@ -115,10 +327,10 @@ class PV(object):
             if self.auto_monitor is None:
                 self.auto_monitor = count < ca.AUTOMONITOR_MAXLENGTH
             if self._monref is None and self.auto_monitor:
-                self._monref = ca.create_subscription(self.chid,
-                                         use_ctrl=(self.form == 'ctrl'),
-                                         use_time=(self.form == 'time'),
-                                         callback=self.__on_changes)
+                # shared with all other PVs for this Channel and form
+                self._monref = ca.subscribe(self.chid, self.__on_changes,
+                                            use_ctrl=(self.form == 'ctrl'),
+                                            use_time=(self.form == 'time'))
 
         if hasattr(self.connection_callback, '__call__'):
             self.connection_callback(pvname=self.pvname, conn=conn, pv=self)
@@ -129,6 +341,10 @@ class PV(object):
         # threads from thinking a connection is complete when it is actually
         # still in progress.
         self.connected = conn
+        if conn:
+            self._conn_event.set()
+        else:
+            self._conn_event.clear()
         return
 
     def wait_for_connection(self, timeout=None):
@@ -140,10 +356,7 @@ class PV(object):
                 timeout = self.connection_timeout
                 if timeout is None:
                     timeout = ca.DEFAULT_CONNECTION_TIMEOUT
-            start_time = time.time()
-            while (not self.connected and
-                   time.time()-start_time < timeout):
-                self.poll()
+            ca._wait_event(self._conn_event, timeout)
         return self.connected
         
     def connect(self, timeout=None):
@@ -157,9 +370,14 @@ class PV(object):
 
     def reconnect(self):
         "try to reconnect PV"
+        if self._released:
+            self._released = False
+            self.chid = self._args['chid'] = ca.create_channel(self.pvname,
+                                                 callback=self.__on_connect)
         self.auto_monitor = None
         self._monref = None
         self.connected = False
+        self._conn_event.clear()
         self._conn_started = False
         return self.wait_for_connection()
     
@@ -167,10 +385,17 @@ class PV(object):
         "poll for changes"
         ca.poll(evt=evt, iot=iot)
 
-    def get(self, count=None, as_string=False, as_numpy=True):
+    def get(self, count=None, as_string=False, as_numpy=True, out=None,
+            max_age=None):
         """returns current value of PV.  Use the options:
          as_string to return string representation
          as_numpy  to (try to) return a numpy array
+         out       numpy array to fill in place with array data
+         max_age   for a PV that is not auto-monitored, return the
+                   last value received if it is at most max_age
+                   seconds old, instead of getting it again.  This
+                   is ignored for an auto-monitored PV, whose value
+                   is always current.
 
         >>> p.get('13BMD:m1.DIR')
         0
@@ -180,11 +405,24 @@ class PV(object):
         if not self.wait_for_connection():
             return None
 
-        if not self.auto_monitor or self._args['value'] is None:
-            self._args['value'] = ca.get(self.chid,
-                                         count=count,
-                                         ftype=self.ftype,
-                                         as_numpy=as_numpy)
+        val = None
+        if not self._is_current(count, max_age):
+            val = ca.get(self.chid, count=count, ftype=self.ftype,
+                         as_numpy=as_numpy, out=out)
+            self._args['value'] = val
+            if out is not None and val is out:
+                # out belongs to the caller, who may change it
+                self._args['value'] = out.copy()
+            self._args['char_value'] = None
+            self.received = time.time()
+            self._received_count = count
+
+        if out is not None:
+            if val is not out:
+                val = self._args['value']
+                nval = min(len(out), len(val))
+                out[:nval] = val[:nval]
+            return out
 
         if as_string:
             self._set_charval(self._args['value'])
@@ -197,6 +435,21 @@ class PV(object):
             return self._args['value'][:count]
         return self._args['value']
 
+    def _is_current(self, count, max_age):
+        """whether the last value received can be returned by get():
+        always for a monitored PV, and only if it is not older than
+        max_age for others."""
+        if self._args['value'] is None:
+            return False
+        if self.auto_monitor:
+            return True
+        if max_age is None or self.received is None:
+            return False
+        if (count is not None and self._received_count is not None and
+            count > self._received_count):
+            return False
+        return time.time() - self.received <= max_age
+
     def put(self, value, wait=False, timeout=30.0,
             use_complete=False, callback=None, callback_data=None):
         """set value for PV, optionally waiting until the processing is
@@ -205,15 +458,31 @@ class PV(object):
         """
         if not self.wait_for_connection():
             return None
+        if use_complete and callback is None:
+            callback = self.__putCallbackStub
+        if not (wait or hasattr(callback, '__call__')):
+            return ca.put(self.chid, self.__put_value(value))
+        self.put_request(value, callback=callback,
+                         callback_data=callback_data)
+        return ca._finish_put(self._put_request, wait, timeout)
+
+    def put_request(self, value, callback=None, callback_data=None):
+        """put value to PV without waiting, returning a ca.PutRequest
+        that can be used to wait for the processing to complete, or
+        passed to ca.wait_all() with other put requests."""
+        if not self.wait_for_connection():
+            return None
+        self._put_request = ca.put_request(self.chid, self.__put_value(value),
+                                           callback=callback,
+                                           callback_data=callback_data)
+        return self._put_request
+
+    def __put_value(self, value):
+        "convert the name of an enum state to its index"
         if (self.ftype in (dbr.ENUM, dbr.TIME_ENUM, dbr.CTRL_ENUM) and
             isinstance(value, str) and value in self._args['enum_strs']):
             value = self._args['enum_strs'].index(value)
-        if use_complete and callback is None:
-            callback = self.__putCallbackStub
-        return ca.put(self.chid, value,
-                      wait=wait, timeout=timeout,
-                      callback=callback,
-                      callback_data=callback_data)
+        return value
 
     def __putCallbackStub(self, pvname=None, **kws):
         "null put-calback, so that the put_complete attribute is valid"
@@ -222,55 +491,39 @@ class PV(object):
     def _set_charval(self, val, call_ca=True):
         """ sets the character representation of the value.
         intended only for internal use"""
+        self._args['char_value'] = cval = self._format_charval(val, call_ca)
+        return cval
+
+    def _get_charval(self, args=None):
+        """ returns the character representation of the value in args
+        (the current data by default), formatting it only once per value.
+        intended only for internal use"""
+        if args is None:
+            args = self._args
+        if args['char_value'] is None:
+            args['char_value'] = self._format_charval(args['value'],
+                                                      call_ca=False)
+        return args['char_value']
+
+    def _format_charval(self, val, call_ca=True):
+        """ returns the character representation of the value.
+        intended only for internal use"""
         ftype = self._args['ftype']
-        ntype = ca.native_type(ftype)
-        if ntype == dbr.STRING:
-            self._args['char_value'] = val
-            return val
-        cval  = repr(val)
-        if self.count > 1:
-            if ntype == dbr.CHAR and self.count < ca.AUTOMONITOR_MAXLENGTH:
-                val = list(val)
-                if 0 in val:
-                    firstnull  = val.index(0)
-                else:
-                    firstnull = len(val)
-                try:
-                    cval = ''.join([chr(i) for i in val[:firstnull]]).rstrip()
-                except ValueError:
-                    pass
-            else:
-                cval = '<array size=%d, type=%s>' % (len(val),
-                                                     dbr.Name(ftype).lower())
-        elif ntype in (dbr.FLOAT, dbr.DOUBLE):
-            if call_ca and self._args['precision'] is None:
-                self.get_ctrlvars()
-            try:
-                prec = getattr(self, 'precision') 
-                fmt  = "%%.%if"
-                if 4 < abs(int(log10(abs(val + 1.e-9)))):
-                    fmt = "%%.%ig"
-                cval = (fmt %  prec) % val
-            except (ValueError, TypeError, ArithmeticError):
-                self._args['char_value'] = str(val)
-                return self._args['char_value']
-
-        elif ntype == dbr.ENUM:
-            if call_ca and self._args['enum_strs'] in ([], None):
+        if call_ca and self._args['count'] == 1:
+            ntype = ca.native_type(ftype)
+            if ((ntype in (dbr.FLOAT, dbr.DOUBLE) and
+                 self._args['precision'] is None) or
+                (ntype == dbr.ENUM and self._args['enum_strs'] in ([], None))):
                 self.get_ctrlvars()
-            try:
-                cval = self._args['enum_strs'][val]
-            except (TypeError, KeyError,  IndexError):
-                pass
-        self._args['char_value'] = cval
-        return cval
+        return _format_value(val, ftype, self._args['count'],
+                             precision=self._args['precision'],
+                             enum_strs=self._args['enum_strs'])
     
     def get_ctrlvars(self):
         "get control values for variable"
         if not self.wait_for_connection():
             return None
         kwds = ca.get_ctrlvars(self.chid)
-        ca.poll()
         self._args.update(kwds)
         return kwds
 
@@ -279,17 +532,37 @@ class PV(object):
         To have user-defined code run when the PV value changes,
         use add_callback()
         """
+        if (self.event_filter is not None and
+            not self.event_filter.accept(value, self.__process_changes,
+                                         value, kwd)):
+            return
+        self.__process_changes(value, kwd)
+
+    def __process_changes(self, value, kwd):
+        "update PV data and run callbacks for a monitor event"
+        now = time.time()
         self._args.update(kwd)
         self._args['value']  = value
-        self._args['timestamp'] = kwd.get('timestamp', time.time())
-        self._set_charval(self._args['value'], call_ca=False)
+        self._args['timestamp'] = kwd.get('timestamp', now)
+        self.received = now
+        self._received_count = None
+        # the character representation is made when first needed,
+        # unless eager_char_value is set
+        if self.eager_char_value:
+            self._set_charval(self._args['value'], call_ca=False)
+        else:
+            self._args['char_value'] = None
 
         if self.verbose:
             now = fmt_time(self._args['timestamp'])
             ca.write('%s: %s (%s)'% (self.pvname,
-                                     self._args['char_value'],
+                                     self._get_charval(),
                                      now))
-        self.run_callbacks()
+        if self.dispatcher is not None:
+            self.dispatcher.submit(self.pvname, self._run_callbacks,
+                                   copy.copy(self._args))
+        else:
+            self.run_callbacks()
         
     def run_callbacks(self):
         """run all user-defined callbacks with the current data
@@ -308,23 +581,47 @@ class PV(object):
         a GUI resource is no longer available).
              
         """
+        self._run_callbacks(self._args)
+
+    def _run_callbacks(self, args):
+        "run all user-defined callbacks with the data in args"
         for index in sorted(list(self.callbacks.keys())):
-            fcn, kwargs = self.callbacks[index]
-            kwd = copy.copy(self._args)
-            kwd.update(kwargs)
-            kwd['cb_info'] = (index, self)
-            if hasattr(fcn, '__call__'):
-                fcn(**kwd)
+            filt = self._callback_filters.get(index, None)
+            if (filt is not None and
+                not filt.accept(args['value'], self._run_callback, index)):
+                continue
+            self._run_callback(index, args)
+
+    def _run_callback(self, index, args=None):
+        "run one user-defined callback, with the current data by default"
+        if index not in self.callbacks:
+            return
+        if args is None:
+            args = self._args
+        fcn, kwargs = self.callbacks[index]
+        if index not in self._callback_nochar:
+            self._get_charval(args)
+        kwd = copy.copy(args)
+        kwd.update(kwargs)
+        kwd['cb_info'] = (index, self)
+        if hasattr(fcn, '__call__'):
+            fcn(**kwd)
             
-    def add_callback(self, callback=None, index=None,
-                     with_ctrlvars=True, **kw):
+    def add_callback(self, callback=None, index=None, with_ctrlvars=True,
+                     event_filter=None, with_char_value=True, **kw):
         """add a callback to a PV.  Optional keyword arguments
         set here will be preserved and passed on to the callback
         at runtime.
 
         Note that a PV may have multiple callbacks, so that each
         has a unique index (small integer) that is returned by
-        add_callback.  This index is needed to remove a callback."""
+        add_callback.  This index is needed to remove a callback.
+
+        An EventFilter given as event_filter limits the events
+        passed on to this callback only.  With with_char_value=False,
+        the callback is passed char_value=None unless the character
+        representation has already been made, so that it is not made
+        for every event only for this callback."""
         if not self.wait_for_connection():
             return None
         if with_ctrlvars:
@@ -335,17 +632,35 @@ class PV(object):
                 if len(self.callbacks) > 0:
                     index = 1 + max(self.callbacks.keys())
             self.callbacks[index] = (callback, kw)
+            self._remove_filter(index)
+            if event_filter is not None:
+                self._callback_filters[index] = event_filter
+            if with_char_value:
+                self._callback_nochar.discard(index)
+            else:
+                self._callback_nochar.add(index)
         return index
     
     def remove_callback(self, index=None):
         """remove a callback by index"""
         if index in self.callbacks:
             self.callbacks.pop(index)
+            self._remove_filter(index)
+            self._callback_nochar.discard(index)
             self.poll()
 
     def clear_callbacks(self):
         "clear all callbacks"
         self.callbacks = {}
+        self._callback_nochar = set()
+        for index in list(self._callback_filters.keys()):
+            self._remove_filter(index)
+
+    def _remove_filter(self, index):
+        "remove event filter for a callback"
+        filt = self._callback_filters.pop(index, None)
+        if filt is not None:
+            filt.cancel()
 
     def _getinfo(self):
         "get information paragraph"
@@ -429,7 +744,9 @@ class PV(object):
     @property
     def char_value(self):
         "character string representation of value"
-        return self._getarg('char_value')
+        if self._args['value'] is None:
+            self.get()
+        return self._get_charval()
 
     @property
     def status(self):
@@ -544,10 +861,7 @@ class PV(object):
     @property
     def put_complete(self):
         "returns True if a put-with-wait has completed"
-        putdone_data = ca._put_done.get(self.pvname, None) 
-        if putdone_data is not None:
-            return putdone_data[0]
-        return True
+        return self._put_request is None or self._put_request.done
 
     def __repr__(self):
         "string representation"
@@ -567,21 +881,229 @@ class PV(object):
     def disconnect(self):
         "disconnect PV"
         self.connected = False
+        self._conn_event.clear()
         if self._monref is not None:
-            cback, uarg, evid = self._monref
-            ca.clear_subscription(evid)
-            ctx = ca.current_context()
-            if self.pvname in ca._cache[ctx]:
-                ca._cache[ctx].pop(self.pvname)
-
-            del cback
-            del uarg
-            del evid
+            monref, self._monref = self._monref, None
+            ca.unsubscribe(monref)
+        if not self._released and self.chid is not None:
+            self._released = True
+            ca.release_channel(self.chid, callback=self.__on_connect)
         ca.poll(evt=1.e-3, iot=1.0)
-        self.callbacks = {}
+        if self.event_filter is not None:
+            self.event_filter.cancel()
+        self.clear_callbacks()
 
     def __del__(self):
         try:
             self.disconnect()
         except:
             pass
+
+class _SharedCtrl(dict):
+    "dictionary of control values, shared by CompactPVs"
+    __slots__ = ('__weakref__',)
+
+## control values shared by CompactPVs with identical values, kept
+## only as long as a connected CompactPV uses them
+_SHARED_CTRL = weakref.WeakValueDictionary()
+
+def _shared_ctrlvars(ctrl):
+    "return a shared, read-only copy of a dictionary of control values"
+    try:
+        key = tuple(sorted(ctrl.items()))
+        return _SHARED_CTRL.setdefault(key, _SharedCtrl(ctrl))
+    except TypeError:
+        return ctrl
+
+class CompactPV(object):
+    """Epics Process Variable using little memory, for processes that
+    hold very many PVs:
+
+      >>> p = CompactPV(pv_name)
+      >>> p.get()
+      >>> p.put(val)
+
+    A CompactPV keeps its data in slots, instead of the dictionaries
+    used by PV: the channel id as an integer, and the value, timestamp,
+    status, and severity of the latest event.  The control values
+    (precision, units, enum_strs, limits) are only fetched when first
+    used, and are shared by all CompactPVs with identical values.
+
+    Callbacks are run with keyword arguments pvname, value, status,
+    severity, timestamp, and pv (this CompactPV), and any keyword
+    arguments given to add_callback().
+    """
+    __slots__ = ('pvname', 'chid', 'connected', 'auto_monitor', 'value',
+                 'timestamp', 'status', 'severity', 'callbacks', '_ctrl',
+                 '_monref')
+
+    def __init__(self, pvname, callback=None, auto_monitor=True):
+        self.pvname = pvname.strip()
+        self.connected = False
+        self.auto_monitor = auto_monitor
+        self.value = None
+        self.timestamp = None
+        self.status = None
+        self.severity = None
+        self.callbacks = None  # made by the first add_callback()
+        self._ctrl = None
+        self._monref = None
+        self.chid = None
+        chid = ca.create_channel(self.pvname, callback=self._on_connect)
+        self.chid = chid.value
+        if callback is not None:
+            self.add_callback(callback)
+
+    def _on_connect(self, pvname=None, chid=None, conn=True):
+        "callback for connection events"
+        self.chid = chid
+        if conn and self.auto_monitor and self._monref is None:
+            self._monref = ca.subscribe(chid, self._on_changes,
+                                        use_time=True)
+        self.connected = conn
+
+    def _on_changes(self, value=None, status=None, severity=None,
+                    timestamp=None, **kws):
+        "callback for monitor events"
+        self.value = value
+        self.status = status
+        self.severity = severity
+        self.timestamp = timestamp
+        if self.callbacks:
+            for index in sorted(self.callbacks.keys()):
+                fcn, kwargs = self.callbacks[index]
+                fcn(pvname=self.pvname, value=value, status=status,
+                    severity=severity, timestamp=timestamp, pv=self,
+                    **kwargs)
+
+    def wait_for_connection(self, timeout=None):
+        "wait for the Channel to connect, returning whether it is connected"
+        if self.chid is None:
+            return False
+        if not self.connected:
+            ca.connect_channel(self.chid, timeout=timeout)
+        return ca.isConnected(self.chid)
+
+    def get(self, as_string=False, as_numpy=True):
+        """returns current value of PV, using the value of the latest
+        monitor event if the PV is monitored"""
+        if not self.wait_for_connection():
+            return None
+        if self._monref is None or self.value is None:
+            self.value = ca.get(self.chid, as_numpy=as_numpy)
+        if as_string:
+            return self.char_value
+        return self.value
+
+    def put(self, value, wait=False, timeout=30.0, callback=None,
+            callback_data=None):
+        "set value for PV, as for PV.put()"
+        if not self.wait_for_connection():
+            return None
+        if (ca.native_type(ca.field_type(self.chid)) == dbr.ENUM and
+            isinstance(value, str)):
+            enum_strs = self.enum_strs
+            if enum_strs is not None and value in enum_strs:
+                value = enum_strs.index(value)
+        return ca.put(self.chid, value, wait=wait, timeout=timeout,
+                      callback=callback, callback_data=callback_data)
+
+    def get_ctrlvars(self):
+        """return dictionary of control values, fetched when first used.
+        This dictionary may be shared with other CompactPVs, and must
+        not be changed."""
+        if self._ctrl is None:
+            if not self.wait_for_connection():
+                return {}
+            ctrl = ca.get_ctrlvars(self.chid)
+            ctrl.pop('status', None)
+            ctrl.pop('severity', None)
+            self._ctrl = _shared_ctrlvars(ctrl)
+        return self._ctrl
+
+    def add_callback(self, callback=None, index=None, **kw):
+        """add a callback to a PV, returning its index, as for
+        PV.add_callback()"""
+        if not hasattr(callback, '__call__'):
+            return None
+        if self.callbacks is None:
+            self.callbacks = {}
+        if index is None:
+            index = 1
+            if len(self.callbacks) > 0:
+                index = 1 + max(self.callbacks.keys())
+        self.callbacks[index] = (callback, kw)
+        return index
+
+    def remove_callback(self, index=None):
+        "remove a callback by index"
+        if self.callbacks is not None and index in self.callbacks:
+            self.callbacks.pop(index)
+
+    def clear_callbacks(self):
+        "clear all callbacks"
+        self.callbacks = None
+
+    def disconnect(self):
+        "disconnect PV"
+        if self._monref is not None:
+            monref, self._monref = self._monref, None
+            ca.unsubscribe(monref)
+        if self.chid is not None:
+            chid, self.chid = self.chid, None
+            ca.release_channel(chid, callback=self._on_connect)
+        self.connected = False
+        self.callbacks = None
+        self._ctrl = None
+
+    @property
+    def char_value(self):
+        "character string representation of value"
+        if self.value is None or self.chid is None:
+            return None
+        ftype = ca.field_type(self.chid)
+        count = ca.element_count(self.chid)
+        ctrl = {}
+        if (count == 1 and
+            ca.native_type(ftype) in (dbr.FLOAT, dbr.DOUBLE, dbr.ENUM)):
+            ctrl = self.get_ctrlvars()
+        return _format_value(self.value, ftype, count,
+                             precision=ctrl.get('precision', None),
+                             enum_strs=ctrl.get('enum_strs', None))
+
+    @property
+    def count(self):
+        "count (number of elements)"
+        if not self.wait_for_connection():
+            return None
+        return ca.element_count(self.chid)
+
+    @property
+    def type(self):
+        "pv type"
+        if not self.wait_for_connection():
+            return None
+        return dbr.Name(ca.field_type(self.chid)).lower()
+
+    @property
+    def precision(self):
+        "number of digits after decimal point"
+        return self.get_ctrlvars().get('precision', None)
+
+    @property
+    def units(self):
+        "engineering units for pv"
+        return self.get_ctrlvars().get('units', None)
+
+    @property
+    def enum_strs(self):
+        "list of enumeration strings"
+        return self.get_ctrlvars().get('enum_strs', None)
+
+    def __repr__(self):
+        "string representation"
+        if self.connected:
+            return "<CompactPV '%s', count=%s, type=%s>" % (self.pvname,
+                                                            self.count,
+                                                            self.type)
+        return "<CompactPV '%s': not connected>" % self.pvname
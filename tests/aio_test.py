@@ -0,0 +1,43 @@
+# test of the epics.aio asyncio interface: connect, get, put and monitor
+# many PVs from one event loop.  Requires Python 3.6 or higher.
+import asyncio
+import time
+from epics import aio, ca
+import pvnames
+
+async def test_connect():
+    chid = await aio.connect(pvnames.double_pv)
+    print('connect: %s connected=%s' % (ca.name(chid), ca.isConnected(chid)))
+    ca.release_channel(chid)
+    try:
+        await aio.connect('Never:A:PV', timeout=1.0)
+    except asyncio.TimeoutError:
+        print('connect: timed out for unconnectable PV, as expected')
+
+async def test_get_put():
+    names = (pvnames.double_pv, pvnames.float_pv, pvnames.int_pv)
+    t0 = time.time()
+    values = await asyncio.gather(*[aio.get(name) for name in names])
+    print('get: %i values in %.3f s: %s' % (len(values), time.time()-t0,
+                                            values))
+    val = values[0] + 1.0
+    ret = await aio.put(pvnames.double_pv, val, wait=True)
+    newval = await aio.get(pvnames.double_pv)
+    print('put with wait: ret=%s, value %s -> %s' % (ret, val, newval))
+
+async def test_monitor(nevents=5):
+    n = 0
+    async for event in aio.monitor(pvnames.updating_pv1):
+        print('monitor: %s %s %.3f' % (event['pvname'], event['value'],
+                                       event['timestamp']))
+        n += 1
+        if n >= nevents:
+            break
+
+async def main():
+    await test_connect()
+    await test_get_put()
+    await asyncio.wait_for(test_monitor(), 30.0)
+    print('channel cache: %s' % ca.channel_cache_info())
+
+asyncio.get_event_loop().run_until_complete(main())
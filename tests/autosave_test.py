@@ -10,3 +10,20 @@ data  = f.read()
 if len(data) > 50:
     print("AutoSave worked... data written to file 'tmp.sav'")
     
+
+results = epics.autosave.restore_pvs('tmp.sav', wait=True, report=True)
+failed = [pvname for pvname, result in results.items() if result != 'ok']
+print("Restored %i of %i PVs with put confirmation" % (len(results)-len(failed),
+                                                       len(results)))
+for pvname in failed:
+    print("  %s: %s" % (pvname, results[pvname]))
+
+# enum states saved by name are restored as the index of that state
+import epics
+f = open('enum.sav', 'w')
+f.write("Py:mbbo1.VAL Pause\nPy:bo1.VAL Off\n<END>\n")
+f.close()
+results = epics.autosave.restore_pvs('enum.sav', wait=True, report=True)
+print("Restored enums by name: %s" % repr(results))
+assert epics.caget('Py:mbbo1', as_string=True) == 'Pause'
+assert epics.caget('Py:bo1', as_string=True) == 'Off'
@@ -0,0 +1,55 @@
+# events per second for a fast PV, with a plain subscription and
+# with a ca.BatchSubscription
+import time
+import epics
+from epics import ca
+import pvnames
+
+pvname = pvnames.updating_pv1
+WAIT = 10.0
+
+chid = ca.create_channel(pvname)
+ca.connect_channel(chid)
+
+def wait(timeout=WAIT):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        time.sleep(1.e-3)
+        epics.poll()
+
+nplain = [0]
+def onchanges(value=None, **kws):
+    nplain[0] += 1
+
+monref = ca.create_subscription(chid, use_time=True, callback=onchanges)
+wait()
+ca.clear_subscription(monref[2])
+print('plain subscription: %i events, %i callbacks' % (nplain[0], nplain[0]))
+
+batches = []
+def onbatch(pvname=None, events=None, **kws):
+    batches.append(events)
+
+sub = ca.BatchSubscription(chid, onbatch, batch_size=1000, window=1.0)
+wait()
+sub.clear()
+nevents = sum([len(events) for events in batches])
+print('batch subscription: %i events, %i callbacks' % (nevents, len(batches)))
+if len(batches) > 0:
+    events = batches[-1]
+    print('last batch: %s' % events.dtype)
+    print('   values %s ... %s' % (events['value'][0], events['value'][-1]))
+    print('   timestamps in order: %s' %
+          (events['timestamp'][1:] >= events['timestamp'][:-1]).all())
+
+# a BatchSubscription is kept alive, and keeps delivering batches, with
+# no reference left to it, until it is cleared
+import gc
+batches = []
+ca.BatchSubscription(chid, onbatch, batch_size=10, window=0.5)
+gc.collect()
+wait(3.0)
+print('unreferenced batch subscription: %i callbacks' % len(batches))
+for sub in list(ca._batch_subscriptions):
+    sub.clear()
+assert len(ca._batch_subscriptions) == 0
@@ -0,0 +1,21 @@
+# ca.get_many() with connected and dead PVs: requests that time out
+# must not be left in ca._pending_gets.
+import sys
+import epics
+from epics import ca
+import pvnames
+
+write = sys.stdout.write
+
+names = [pvnames.double_pv, pvnames.long_pv, 'Not.A.Real.PV']
+connected, unconnected = ca.connect_many(names, timeout=2.0)
+chids = [connected.get(name, unconnected.get(name)) for name in names]
+
+for i in range(3):
+    values = ca.get_many(chids, timeout=1.0)
+    for name, (value, status) in zip(names, values):
+        write('%s = %r (status %i)\n' % (name, value, status))
+    assert values[-1][0] is None
+    assert len(ca._pending_gets) == 0
+
+write('pending gets after get_many: %i\n' % len(ca._pending_gets))
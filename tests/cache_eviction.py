@@ -0,0 +1,25 @@
+# caget() on many PV names with a limited PV and Channel cache:
+# the number of open Channels should stay at the limits.
+import time
+import sys
+import epics
+from epics import ca
+import pvnames
+
+write = sys.stdout.write
+
+epics.CACHE_SIZE = 2
+ca.CHANNEL_CACHE_SIZE = 3
+ca.CHANNEL_IDLE_TIMEOUT = 2.0
+
+names = pvnames.updating_pvlist + [pvnames.double_pv2, pvnames.float_pv,
+                                   pvnames.long_pv, pvnames.enum_pv]
+for loop in range(3):
+    for pvname in names:
+        epics.caget(pvname)
+    write('loop %i: %s\n' % (loop, epics.cache_info()))
+
+time.sleep(2.5)
+epics.caget(names[0])
+write('after idle timeout: %s\n' % epics.cache_info())
+ca.show_cache()
@@ -59,7 +59,7 @@ connection takes less than 8ms per PV.
 
 testconnect(pvnames, False)
 
-epics.ca._cache = {}
+epics.ca._cache.clear()
 
 testconnect(pvnames, True)
 
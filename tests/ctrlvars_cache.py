@@ -0,0 +1,43 @@
+# time caget(as_string=True) and get_ctrlvars with and without
+# ca.CTRLVARS_CACHE
+import time
+import epics
+from epics import ca
+import pvnames
+
+NLOOPS = 200
+pvname = pvnames.double_pv
+
+for use_cache in (False, True):
+    ca.CTRLVARS_CACHE = use_cache
+    pv = epics.PV(pvname)
+    pv.wait_for_connection()
+    t0 = time.time()
+    for i in range(NLOOPS):
+        pv.get_ctrlvars()
+    t1 = time.time()
+    for i in range(NLOOPS):
+        epics.caget(pvname, as_string=True)
+    t2 = time.time()
+    print('CTRLVARS_CACHE=%s: get_ctrlvars %.3f ms, caget(as_string) %.3f ms'
+          % (use_cache, 1000*(t1-t0)/NLOOPS, 1000*(t2-t1)/NLOOPS))
+
+print('subscriptions: %s' % ca.subscription_info())
+print('precision, units: %s, %s' % (pv.precision, pv.units))
+
+# the cached CTRL fields are dropped when a Channel is cleared,
+# directly or when an idle Channel is reclaimed from the cache.
+chid = ca.create_channel(pvnames.float_pv, connect=True)
+ca.get_ctrlvars(chid)
+assert chid.value in ca._ctrlvars
+ca.clear_channel(chid)
+assert chid.value not in ca._ctrlvars
+
+ca.CHANNEL_CACHE_SIZE = 0
+chid = ca.create_channel(pvnames.long_pv, connect=True)
+ca.get_ctrlvars(chid)
+assert chid.value in ca._ctrlvars
+ca.release_channel(chid)
+ca._reclaim_channels(ca.current_context())
+assert chid.value not in ca._ctrlvars
+print('cached CTRL fields dropped with their Channels')
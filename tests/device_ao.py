@@ -27,6 +27,13 @@ if len(flines) < 10:
     print(" write_state didn't work properly")
     sys.exit()
 
+t0 = time.time()
+state = myao.save_state()
+print(" save_state for %i attributes in %.4f sec" % (len(state), time.time()-t0))
+missing = [k for k, v in state.items() if v is None]
+if len(missing) > 0:
+    print(" save_state missing values: %s" % missing)
+
 print(" all tests passed!")
 
 
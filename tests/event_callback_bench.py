@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# microbenchmark of the subscription callback path in ca._onGetEvent,
+# comparing a plain callback as user argument (as used before
+# subscriptions had a precomputed context) with the _EventContext
+# made by ca.create_subscription().
+#
+# Synthetic event_handler_args are used, so the PV does not need to
+# be connected, but the CA library must be available.
+import sys
+import time
+import ctypes
+
+from epics import ca, dbr
+import pvnames
+
+NEVENTS = 100000
+write = sys.stdout.write
+
+chid = ca.create_channel(pvnames.double_pv)
+
+def onChanges(pvname=None, value=None, **kws):
+    pass
+
+write('%-14s %12s %12s\n' % ('DBR type', 'plain (us)', 'context (us)'))
+for ftype in (dbr.DOUBLE, dbr.TIME_DOUBLE, dbr.CTRL_DOUBLE,
+              dbr.TIME_ENUM, dbr.CTRL_ENUM):
+    data = dbr.Map[ftype]()
+    args = dbr.event_handler_args()
+    args.chid = chid.value
+    args.type = ftype
+    args.count = 1
+    args.raw_dbr = ctypes.addressof(data)
+    args.status = dbr.ECA_NORMAL
+
+    times = []
+    for usr in (onChanges, ca._EventContext(onChanges, chid, ftype)):
+        args.usr = usr
+        t0 = time.time()
+        for i in range(NEVENTS):
+            ca._onGetEvent(args)
+        times.append(1.e6*(time.time()-t0)/NEVENTS)
+    write('%-14s %12.2f %12.2f\n' % (dbr.Name(ftype), times[0], times[1]))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# benchmark of the time for 'import epics', run in fresh Python
+# processes, and of the modules imported along with it.  As numpy and
+# the epics submodules are imported on first use, and the CA library
+# is loaded by the first CA call, this should be close to the time
+# for starting Python itself.
+#
+# Neither an IOC nor the CA library is needed.
+import sys
+import subprocess
+
+NRUNS = 20
+write = sys.stdout.write
+
+TIMER = """
+import sys, time
+t0 = time.time()
+%s
+dt = time.time() - t0
+mods = [m for m in ('numpy', 'epics.pv', 'epics.device', 'epics.motor',
+                    'epics.alarm') if m in sys.modules]
+print('%%.6f %%s' %% (dt, ','.join(mods) or '-'))
+"""
+
+def best_time(stmt):
+    "best of NRUNS times for stmt in a new process, and modules loaded"
+    times = []
+    for i in range(NRUNS):
+        out = subprocess.check_output([sys.executable, '-c', TIMER % stmt])
+        dt, mods = out.decode().split()
+        times.append(float(dt))
+    return min(times), mods
+
+write('%-36s %10s   %s\n' % ('statement', 'time (ms)', 'modules imported'))
+for stmt in ('pass',
+             'import numpy',
+             'import epics',
+             'import epics; epics.PV',
+             'import epics; epics.Motor'):
+    dt, mods = best_time(stmt)
+    write('%-36s %10.2f   %s\n' % (stmt, 1000*dt, mods))
@@ -45,7 +45,7 @@ def run(t=10.0):
     print 'Destroying PVs: '
     for i in pvs:
         i.disconnect()
-    print epics.ca._cache.keys()
+    print len(epics.ca._cache)
     epics.ca.show_cache()
     epics.ca.poll(0.01, 10.0)
     time.sleep(1.0)
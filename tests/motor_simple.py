@@ -31,3 +31,28 @@ def testDial(motorname,start, step, npts, offset=1.0):
 
 
 testDial(pvnames.motor1, 0.5, 0.01, 10, offset=0.1)
+
+def testMoveMany(motornames, targets):
+    "move several motors at once, waiting for all of them"
+    motors = [epics.Motor(name) for name in motornames]
+    t0 = time.time()
+    ret = epics.motor.move_many(dict(zip(motors, targets)), wait=True)
+    print 'move_many returned %s in %.3f sec' % (repr(ret), time.time()-t0)
+    for m in motors:
+        print ' %s at %f' % (m.description, m.get_position(readback=True))
+
+testMoveMany((pvnames.motor1, pvnames.motor2), (0.5, 1.0))
+
+def testMoveManyUnreachable(motorname, drivepv):
+    "move_many with one unreachable drive PV: no motor is moved"
+    m1 = epics.Motor(motorname)
+    m2 = epics.Motor(motorname)
+    m2._pvs['VAL'] = epics.PV(drivepv, connection_timeout=1.0)
+    start = m1.get_position()
+    ret = epics.motor.move_many({m1: start + 0.1, m2: 0.0}, wait=True,
+                                ignore_limits=True)
+    print 'move_many with %s returned %s' % (drivepv, repr(ret))
+    assert ret is None
+    assert abs(m1.get_position() - start) < 1.e-6
+
+testMoveManyUnreachable(pvnames.motor1, 'Not.A.Motor.VAL')
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# check the conversion of array values for ca.put() to the native types
+# of Channels, as done by ca._put_data().
+#
+# This does not need a running IOC: only the data buffers are built.
+import sys
+import ctypes
+import numpy
+
+from epics import ca, dbr
+
+write = sys.stdout.write
+
+def values(data, ftype, count):
+    "values in the buffer returned by _put_data"
+    ptr = ctypes.cast(data, ctypes.POINTER(count*dbr.Map[ftype]))
+    return list(ptr.contents)
+
+def check_put(ftype, value, expected):
+    count = len(expected)
+    out = values(ca._put_data(ftype, count, value), ftype, count)
+    assert out == expected, (dbr.Name(ftype), out, expected)
+    write('OK   %-6s %-24s -> %s\n' % (dbr.Name(ftype), repr(value), out))
+
+def check_raises(ftype, value, count=4):
+    try:
+        ca._put_data(ftype, count, value)
+    except ca.ChannelAccessException:
+        write('OK   %-6s %-24s raises\n' % (dbr.Name(ftype), repr(value)))
+    else:
+        raise AssertionError('%s: %r did not raise' % (dbr.Name(ftype), value))
+
+# int64 arrays with values in range: not a 'safe' cast, but allowed
+check_put(dbr.CHAR,  numpy.array([72, 105, 0, 255]), [72, 105, 0, 255])
+check_put(dbr.ENUM,  numpy.array([0, 1, 2, 15]), [0, 1, 2, 15])
+check_put(dbr.SHORT, numpy.array([-3, 0, 3, 32767]), [-3, 0, 3, 32767])
+check_put(dbr.FLOAT, numpy.array([1.5, -2.0, numpy.inf, 0.0]),
+          [1.5, -2.0, float('inf'), 0.0])
+check_put(dbr.DOUBLE, numpy.array([1, 2], dtype='int32'), [1.0, 2.0])
+check_put(dbr.CHAR, 'Hi', [72, 105, 0, 0])
+
+# values that do not fit the native type
+check_raises(dbr.CHAR,  numpy.array([1, 256, 3, 4]))
+check_raises(dbr.ENUM,  numpy.array([-1, 0, 1, 2]))
+check_raises(dbr.SHORT, numpy.array([100000, 0, 1, 2]))
+check_raises(dbr.FLOAT, numpy.array([1e300, 0, 1, 2]))
+check_raises(dbr.LONG,  numpy.array([1.5, 2.0, 3.0, 4.0]))
+check_raises(dbr.CHAR,  u'café')
+write('put conversion tests passed\n')
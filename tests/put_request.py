@@ -0,0 +1,26 @@
+"""test put requests: many puts with completion, waited on together"""
+import time
+import epics
+from epics import ca
+import pvnames
+
+pvs = [epics.PV(name) for name in (pvnames.motor1, pvnames.motor2)]
+for pv in pvs:
+    pv.wait_for_connection()
+
+print '== Move both motors at once'
+t0 = time.time()
+reqs = [pv.put_request(1.0) for pv in pvs]
+print 'requests: ', reqs
+print 'wait_all:  %s' % ca.wait_all(reqs, timeout=60.0)
+print 'elapsed time: %.3f sec' % (time.time()-t0)
+
+print '== Several overlapping puts to the same PV'
+def onPutDone(pvname=None, data=None, **kws):
+    print '  put done for %s, data=%s' % (pvname, repr(data))
+
+reqs = [pvs[0].put_request(val, callback=onPutDone, callback_data=val)
+        for val in (0.0, 0.5, 0.0)]
+print 'wait_all:  %s' % ca.wait_all(reqs, timeout=60.0)
+print 'status: ', [r.status for r in reqs]
+print 'pending put requests (should be 0): %i' % len(ca._put_done)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# measure CPU use while many put-with-wait calls are outstanding.
+#
+# Each thread moves one motor with put(wait=True).  With preemptive
+# callbacks, the waiting threads should block on their put-completion
+# events, so that CPU time stays far below wall-clock time.
+import os
+import sys
+import time
+from threading import Thread
+
+import epics
+import pvnames
+
+NLOOPS = 2
+write = sys.stdout.write
+
+def move_motor(pvname, targets):
+    epics.ca.context_create()
+    p = epics.PV(pvname)
+    p.wait_for_connection()
+    for target in targets:
+        p.put(target, wait=True, timeout=60.0)
+
+motors = ['%s.VAL' % m for m in pvnames.motor_list]
+start_vals = [epics.caget(m) for m in motors]
+
+threads = []
+for pvname, val in zip(motors, start_vals):
+    targets = [val + 0.5, val]*NLOOPS
+    threads.append(Thread(target=move_motor, args=(pvname, targets)))
+
+t0 = time.time()
+cpu0 = sum(os.times()[:2])
+for th in threads:
+    th.start()
+for th in threads:
+    th.join()
+wall = time.time() - t0
+cpu = sum(os.times()[:2]) - cpu0
+
+write('%i threads doing put(wait=True):\n' % len(threads))
+write('  wall clock time = %8.3f sec\n' % wall)
+write('  CPU time        = %8.3f sec  (%.1f%% of one core)\n' %
+      (cpu, 100.0*cpu/max(wall, 1.e-9)))
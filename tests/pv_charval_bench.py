@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# events per second through the PV monitor event path, with the
+# character representation (char_value) made for every event
+# (eager_char_value=True, as it always was before) or only when
+# needed (the default).
+#
+# Events are passed directly to the PV's internal event handler, so the
+# PV does not need to be connected, but the CA library must be available.
+import sys
+import time
+
+from epics import ca, dbr, pv
+import pvnames
+
+NEVENTS = 20000   # events for scalar PVs, fewer for arrays
+write = sys.stdout.write
+
+def onChanges(pvname=None, value=None, **kws):
+    pass
+
+def make_pv(eager, ftype, count, callback=None, with_char_value=True):
+    "PV set up as if connected to a Channel of ftype and count"
+    thispv = pv.PV(pvnames.double_pv, auto_monitor=False,
+                   eager_char_value=eager)
+    thispv._args.update({'ftype': ftype, 'count': count, 'precision': 4,
+                         'enum_strs': ('Stop', 'Start', 'Pause')})
+    if callback is not None:
+        index = 1 + len(thispv.callbacks)
+        thispv.callbacks[index] = (callback, {})
+        if not with_char_value:
+            thispv._callback_nochar.add(index)
+    return thispv
+
+def rate(thispv, values, nevents):
+    "events per second"
+    on_changes = thispv._PV__on_changes
+    nvals = len(values)
+    t0 = time.time()
+    for i in range(nevents):
+        on_changes(value=values[i % nvals], status=0, severity=0)
+    return nevents/(time.time()-t0)
+
+chars = [[(65 + (i + j) % 26) for j in range(16000)] for i in range(4)]
+cases = (('double', dbr.DOUBLE, 1, [1.0 + 0.001*i for i in range(100)]),
+         ('enum', dbr.ENUM, 1, [0, 1, 2]),
+         ('char[16000]', dbr.CHAR, 16000, chars))
+
+write('%-14s %-24s %12s %12s\n' % ('type', 'callbacks', 'eager (/s)',
+                                   'lazy (/s)'))
+for label, ftype, count, values in cases:
+    nevents = max(100, NEVENTS//count)
+    for cblabel, callback, with_char in (('none', None, True),
+                                         ('with char_value', onChanges, True),
+                                         ('without char_value', onChanges,
+                                          False)):
+        rates = [rate(make_pv(eager, ftype, count, callback, with_char),
+                      values, nevents) for eager in (True, False)]
+        write('%-14s %-24s %12.0f %12.0f\n' % (label, cblabel,
+                                               rates[0], rates[1]))
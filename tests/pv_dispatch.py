@@ -0,0 +1,40 @@
+# compare slow PV callbacks run in the CA callback with callbacks run
+# by a dispatch.Dispatcher, counting the events for a second PV that
+# has a fast callback.
+import time
+import epics
+import sys
+import pvnames
+from epics import pv, dispatch
+
+write = sys.stdout.write
+
+def slow_callback(pvname=None, value=None, **kw):
+    time.sleep(0.5)
+
+def run(label):
+    counts = {'fast': 0}
+    def fast_callback(pvname=None, value=None, **kw):
+        counts['fast'] += 1
+
+    slow = epics.PV(pvnames.updating_pvlist[0])
+    fast = epics.PV(pvnames.updating_pvlist[1])
+    slow.add_callback(slow_callback)
+    fast.add_callback(fast_callback)
+    t0 = time.time()
+    while time.time() - t0 < 10:
+        time.sleep(1.e-3)
+    slow.disconnect()
+    fast.disconnect()
+    write('%-12s fast PV events in 10 seconds: %i\n' % (label,
+                                                        counts['fast']))
+
+run('inline')
+pv.CALLBACK_DISPATCHER = dispatch.Dispatcher(workers=2, maxsize=10)
+run('dispatched')
+stats = pv.CALLBACK_DISPATCHER.stats()
+write('dispatcher: processed %i, dropped %i, pending %i\n' % (
+    stats['processed'], stats['dropped'], stats['depth']))
+for key, kstats in stats['keys'].items():
+    write('  %-20s max depth %i, dropped %i\n' % (key, kstats['max_depth'],
+                                                 kstats['dropped']))
@@ -0,0 +1,32 @@
+import time
+import epics
+import sys
+import pvnames
+
+pvname = pvnames.updating_pv1
+
+write = sys.stdout.write
+
+counts = {'all': 0, 'rate': 0, 'deadband': 0}
+def onChanges(pvname=None, value=None, key='all', **kw):
+    counts[key] += 1
+
+mypv = epics.PV(pvname)
+mypv.add_callback(onChanges, key='all')
+rate_filter = epics.EventFilter(max_rate=2)
+mypv.add_callback(onChanges, key='rate', event_filter=rate_filter)
+band_filter = epics.EventFilter(deadband_percent=1)
+mypv.add_callback(onChanges, key='deadband', event_filter=band_filter)
+
+write('Added callbacks with event filters.  Now wait for changes...\n')
+t0 = time.time()
+while time.time() - t0 < 10:
+    time.sleep(1.e-3)
+
+write('events seen by each callback in 10 seconds:\n')
+for key in ('all', 'rate', 'deadband'):
+    write('  %-10s %i\n' % (key, counts[key]))
+write('rate filter:     passed %i, dropped %i\n' % (rate_filter.passed,
+                                                    rate_filter.dropped))
+write('deadband filter: passed %i, dropped %i\n' % (band_filter.passed,
+                                                    band_filter.dropped))
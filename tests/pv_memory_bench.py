@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# memory used per PV object, measured with tracemalloc, for PV and
+# for the slots-based CompactPV, for NPVS objects for each of a few
+# PV names.
+#
+# The PVs in pvnames.py should be served by a running IOC, so that the
+# memory used after connecting (subscriptions, control values) is
+# included.  PVs for the same name share one Channel, so the memory
+# for the Channels themselves is not counted.
+import sys
+import time
+import tracemalloc
+
+from epics import ca, pv
+import pvnames
+
+NPVS = 10000
+names = (pvnames.double_pv, pvnames.enum_pv, pvnames.int_pv)
+write = sys.stdout.write
+
+def measure(pvclass):
+    "bytes per PV, with all PVs connected and their values read"
+    # create the Channels first, so that they are not counted
+    for name in names:
+        ca.connect_channel(ca.create_channel(name))
+    tracemalloc.start()
+    t0 = time.time()
+    pvs = [pvclass(name) for name in names for i in range(NPVS)]
+    for thispv in pvs:
+        thispv.wait_for_connection()
+        thispv.get(as_string=True)
+    ca.poll(evt=0.1)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    elapsed = time.time() - t0
+    for thispv in pvs:
+        thispv.disconnect()
+    # shared control values are dropped with the last PV using them
+    assert len(pv._SHARED_CTRL) == 0, len(pv._SHARED_CTRL)
+    return current/len(pvs), elapsed
+
+write('%-12s %14s %12s\n' % ('class', 'bytes per PV', 'time (s)'))
+for pvclass in (pv.PV, pv.CompactPV):
+    nbytes, elapsed = measure(pvclass)
+    write('%-12s %14.0f %12.2f\n' % (pvclass.__name__, nbytes, elapsed))
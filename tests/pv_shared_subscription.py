@@ -0,0 +1,44 @@
+# test that PVs for the same channel share one subscription
+import time
+import epics
+from epics import ca
+import pvnames
+pvname = pvnames.updating_pv1
+
+NPVS = 100
+
+def wait(timeout=5):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        time.sleep(1.e-3)
+        epics.poll()
+
+counts = {}
+def onChanges(pvname=None, value=None, cb_info=None, **kw):
+    key = id(cb_info[1])
+    counts[key] = counts.get(key, 0) + 1
+
+pvs = []
+for i in range(NPVS):
+    pv = epics.PV(pvname, form='time')
+    pv.add_callback(onChanges, with_char_value=False)
+    pvs.append(pv)
+
+for pv in pvs:
+    pv.wait_for_connection()
+
+print('%i PVs for %s: %s' % (NPVS, pvname, ca.subscription_info()))
+wait(5)
+print('events per PV: min=%i, max=%i' % (min(counts.values()),
+                                         max(counts.values())))
+print('all PVs same value: %s' % (len(set([pv.value for pv in pvs])) == 1))
+
+late = epics.PV(pvname, form='time')
+late.wait_for_connection()
+print('late PV has value: %s' % (late.value is not None))
+
+for pv in pvs:
+    pv.disconnect()
+print('after disconnecting %i PVs: %s' % (NPVS, ca.subscription_info()))
+late.disconnect()
+print('after disconnecting all: %s' % ca.subscription_info())
@@ -72,6 +72,18 @@ class PV_Tests(unittest.TestCase):
         self.failUnless(len(val[1]) > 1)
         resume_updating()
 
+    def test_get_out(self):
+        write('Get into out: the PV keeps its own copy of the value\n')
+        pv = PV(pvnames.double_arr_pv, auto_monitor=False)
+        pv.wait_for_connection()
+        out = numpy.zeros(pv.count)
+        val = pv.get(out=out)
+        self.failUnless(val is out)
+        self.failUnless(pv.value is not out)
+        saved = out.copy()
+        out[:] = -1.0
+        self.failUnless(numpy.all(pv.get(max_age=60) == saved))
+
     def test_putwait(self):
         write('Put with wait (using real motor!) \n')
         pv = PV(pvnames.motor1)
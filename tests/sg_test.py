@@ -1,4 +1,5 @@
 import time
+import warnings
 import epics
 import pvnames
 print '== Test get/put for synchronous groups'
@@ -14,6 +15,9 @@ for chid in chids:
 print 'Now create synch group '
 sg = epics.ca.sg_create()
 
+# sg_get() returns data buffers, filled in by sg_block() and unpacked
+# with _unpack().  It no longer returns values: as_numpy and as_string
+# are ignored, with a warning.
 data = [epics.ca.sg_get(sg, chid) for chid in chids]
 
 print 'Now change these PVs for the next 10 seconds'
@@ -25,6 +29,12 @@ print 'Done.  Values'
 for pvname, dat, chid in zip(pvs, data, chids):
     print "%s = %s" % (pvname, str( epics.ca._unpack(dat, chid=chid)))
 
+with warnings.catch_warnings(record=True) as warned:
+    warnings.simplefilter('always')
+    epics.ca.sg_get(sg, chids[0], as_string=True)
+print 'sg_get(as_string=True) warns: %s' % (len(warned) == 1)
+epics.ca.sg_block(sg)
+
 epics.ca.sg_reset(sg)
 
 print 'OK, now we will put everything back to 0 synchronously'
@@ -39,3 +49,16 @@ print 'done.'
 
 
           
+epics.ca.sg_delete(sg)
+
+print '== Test SyncGroup: repeated snapshots of the same PVs'
+sg = epics.ca.SyncGroup(chids)
+t0 = time.time()
+for i in range(10):
+    values = sg.get()
+print '10 snapshots in %.3f sec: %s' % (time.time()-t0, repr(values))
+sg.put([v + 0.1 for v in values])
+print 'after put: %s' % repr(sg.get())
+sg.put(values)
+sg.close()
+print 'done.'
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# measure memory allocated per frame when unpacking array data,
+# with and without ca.ZERO_COPY_ARRAYS.
+#
+# This does not need a running IOC: synthetic DBR buffers are used,
+# as would be filled in by ca.get() or passed to a subscription callback.
+import sys
+import ctypes
+import tracemalloc
+
+from epics import ca, dbr
+
+NELEM = 4*1024*1024
+NFRAMES = 5
+
+# value offsets, as would be read from libca's dbr_value_offset
+offsets = (39*ctypes.c_short)()
+for ftype in range(dbr.TIME_STRING, dbr.TIME_DOUBLE+1):
+    offsets[ftype] = dbr.Map[ftype].value.offset
+dbr.value_offset = offsets
+
+def measure(ftype, own_data, zero_copy):
+    ca.ZERO_COPY_ARRAYS = zero_copy
+    data = (NELEM*dbr.Map[ftype])()
+    tracemalloc.start()
+    for i in range(NFRAMES):
+        val = ca._unpack(data, count=NELEM, ftype=ftype, own_data=own_data)
+        del val
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+if not ca.HAS_NUMPY:
+    sys.stdout.write('numpy is required for this test\n')
+    sys.exit(1)
+
+fmt = '%-12s %-14s  zero_copy=False: %8.2f MB   zero_copy=True: %8.2f MB\n'
+for ftype in (dbr.CHAR, dbr.DOUBLE, dbr.TIME_CHAR, dbr.TIME_DOUBLE):
+    for own_data, label in ((True, 'get'), (False, 'subscription')):
+        old = measure(ftype, own_data, False)
+        new = measure(ftype, own_data, True)
+        sys.stdout.write(fmt % (dbr.Name(ftype), label,
+                                old/1.e6, new/1.e6))